@@ -1,64 +1,21 @@
 """Load PRDs + guidelines, scan suspect file for rule hits, compute TAT."""
-import re
 from datetime import datetime
 from typing import List, Optional
 from .schema import Incident, Candidate, Observation
-from .loaders import load_guidelines, load_prd_yaml, load_repo_file, load_services
+from .loaders import get_knowledge_base, load_prd_yaml, load_repo_file, get_file_extension
+from .rules import compile_rule_set
 
 
 def analyze_code(incident: Incident, suspect: Candidate) -> List[Observation]:
     """Analyze suspect code against PRDs and guidelines."""
-    observations = []
-    
-    # Load guidelines
-    guidelines = load_guidelines()
-    
     # Load source code
     code = load_repo_file(suspect.repo, suspect.file)
     if not code:
-        return observations
-    
-    # Check each guideline pattern
-    for guideline in guidelines:
-        pattern = guideline['pattern']
-        rule_type = guideline['type']
-        explanation = guideline['explanation']
-        
-        # Check if pattern matches
-        if _pattern_matches(pattern, code, incident):
-            observations.append(Observation(
-                kind=rule_type,
-                note=explanation,
-                rule=pattern
-            ))
-    
-    return observations
-
-
-def _pattern_matches(pattern: str, code: str, incident: Incident) -> bool:
-    """Check if a pattern matches the code or incident."""
+        return []
     
-    # Special patterns
-    if pattern == "gateway exceeded 5s":
-        return "gateway exceeded 5s" in incident.error_message
-    
-    if pattern == "missing_log_context":
-        # Check if error handling lacks context logging
-        return "throw" in code and not any(field in code for field in ["request_id", "user_id", "amount"])
-    
-    if pattern == "function_lines_gt_50":
-        # Simple heuristic: count lines in functions
-        lines = code.split('\n')
-        return len(lines) > 50
-    
-    if pattern == "bare except":
-        return re.search(r'except\s*:', code) is not None
-    
-    # Regex patterns
-    try:
-        return re.search(pattern, code) is not None
-    except re.error:
-        return False
+    # Guidelines are compiled once per guidelines.csv version
+    rules = get_knowledge_base().derive('guidelines', compile_rule_set)
+    return rules.evaluate(code, get_file_extension(suspect.file), incident)
 
 
 def compute_tat(incident: Incident) -> Optional[str]:
@@ -171,7 +128,7 @@ def generate_candidate_fixes(incident: Incident, suspect: Candidate, observation
 
 def get_owners(incident: Incident) -> str:
     """Get owners for the incident."""
-    services = load_services()
+    services = get_knowledge_base().services
     service_info = services.get(incident.service, {})
     return service_info.get('owners', '@unknown')
 
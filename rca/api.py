@@ -1,22 +1,45 @@
 """FastAPI backend for RCA Agent web interface."""
+import asyncio
 import os
-import subprocess
 import json
+import mimetypes
+import uuid
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, List, Any
-from fastapi import FastAPI, HTTPException, Response
+from typing import Dict, List, Any, Optional
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 import logging
+from .artifacts import PRECOMPRESS_SUFFIXES, fresh_precompressed
+from .bundle import BUNDLE_FORMATS, bundle_filename, bundle_files, iter_bundle, rca_pdf_paths
+from .dirindex import DirectoryIndex
+from .jobs import JobManager
+from .pdfs import PDFRenderer
+from .pipeline import (
+    run_triage, run_initial_rca, run_final_rca, run_draft_pr,
+    run_ticket, run_apply_fix, run_compare, run_demo
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pipeline stages now run in this process and read data/, repos/ and
+    # docs/ relative to the working directory
+    os.chdir(BASE_DIR)
+    yield
+    jobs.shutdown(wait=False)
+    pdf_renderer.shutdown(wait=False)
+
 app = FastAPI(
     title="RCA Agent API",
     description="Web API for Root Cause Analysis automation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for local development
@@ -34,41 +57,12 @@ OUT_DIR = BASE_DIR / "out"
 LINEAR_MOCK_DIR = BASE_DIR / "linear_mock"
 INCIDENTS_DIR = BASE_DIR / "incidents"
 
-def run_cli_command(command: List[str]) -> Dict[str, Any]:
-    """Run a CLI command and return structured output."""
-    try:
-        # Ensure we're in the right directory
-        result = subprocess.run(
-            command,
-            cwd=BASE_DIR,
-            capture_output=True,
-            text=True,
-            timeout=60  # 60 second timeout
-        )
-        
-        return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "returncode": result.returncode,
-            "command": " ".join(command)
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "stdout": "",
-            "stderr": "Command timed out after 60 seconds",
-            "returncode": -1,
-            "command": " ".join(command)
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "stdout": "",
-            "stderr": str(e),
-            "returncode": -1,
-            "command": " ".join(command)
-        }
+# Pipeline jobs run on bounded per-operation pools (see rca/jobs.py)
+jobs = JobManager()
+# RCA jobs write markdown only; PDFs render in this separate process pool,
+# right after the job ("background") or on first download ("lazy")
+pdf_renderer = PDFRenderer(base_dir=str(BASE_DIR))
+PDF_MODE = os.getenv("RCA_PDF_MODE", "background")
 
 @app.get("/health")
 async def health_check():
@@ -80,248 +74,437 @@ async def health_check():
         "base_dir": str(BASE_DIR)
     }
 
+def parse_incident(path: Path) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return {
+        "filename": path.name,
+        "id": data.get("id", path.stem),
+        "title": data.get("title", "Unknown"),
+        "service": data.get("service", "Unknown"),
+        "created_at": data.get("created_at", "Unknown")
+    }
+
+def parse_ticket(path: Path) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return {
+        "filename": path.name,
+        "id": data.get("id", path.stem),
+        "title": data.get("title", "Unknown"),
+        "team": data.get("team", "Unknown"),
+        "status": data.get("status", "Unknown"),
+        "download_url": f"/download/{path.name}"
+    }
+
+# Listings are served from in-memory indexes kept current by inotify (or
+# polling), so a request only costs re-reading the files that changed
+incident_index = DirectoryIndex(INCIDENTS_DIR, "*.json", parse=parse_incident)
+artifact_index = DirectoryIndex(OUT_DIR, group_key=lambda name: name.split("_", 1)[0])
+ticket_index = DirectoryIndex(LINEAR_MOCK_DIR, "*.json", parse=parse_ticket)
+
+# Distinguishes ETags across server restarts, since index versions restart at 0
+ETAG_PREFIX = uuid.uuid4().hex[:8]
+
+def listing_etag(*indexes: DirectoryIndex) -> str:
+    versions = "-".join(str(index.current_version()) for index in indexes)
+    return f'"{ETAG_PREFIX}-{versions}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers etag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def cached_listing(request: Request, etag: str, build) -> Response:
+    """Return 304 if the client's copy is current, else the JSON listing."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
 @app.get("/incidents")
-async def list_incidents():
+async def list_incidents(request: Request):
     """List available incident files."""
-    try:
-        incidents = []
-        if INCIDENTS_DIR.exists():
-            for file in INCIDENTS_DIR.glob("*.json"):
-                try:
-                    with open(file, 'r') as f:
-                        data = json.load(f)
-                    incidents.append({
-                        "filename": file.name,
-                        "id": data.get("id", file.stem),
-                        "title": data.get("title", "Unknown"),
-                        "service": data.get("service", "Unknown"),
-                        "created_at": data.get("created_at", "Unknown")
-                    })
-                except Exception as e:
-                    logger.warning(f"Failed to parse {file}: {e}")
-        
+    def build():
+        incidents = [entry["data"] for entry in incident_index.entries()]
         return {
             "success": True,
             "incidents": incidents,
             "count": len(incidents)
         }
+    
+    try:
+        return cached_listing(request, listing_etag(incident_index), build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/triage/{incident}")
-async def triage_incident(incident: str):
-    """Run triage analysis on an incident."""
+def incident_file_for(incident: str) -> str:
+    """Return the incident path relative to BASE_DIR, or raise 404."""
     incident_file = f"incidents/{incident}.json"
     if not (BASE_DIR / incident_file).exists():
         raise HTTPException(status_code=404, detail=f"Incident file {incident_file} not found")
-    
-    command = ["python3", "-m", "rca.cli", "triage", incident_file]
-    result = run_cli_command(command)
-    
+    return incident_file
+
+def submit_job(operation: str, incident: str, func, *args, with_events: bool = False) -> Dict[str, Any]:
+    """Queue a pipeline stage and return the job handle for the response."""
+    job = jobs.submit(operation, func, *args, incident=incident, with_events=with_events)
     return {
-        "operation": "triage",
+        "operation": operation,
         "incident": incident,
-        "result": result,
-        "timestamp": str(Path().cwd())
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
     }
 
-@app.post("/rca/initial/{incident}")
+def stage_artifacts(result: Any) -> List[Dict[str, Any]]:
+    """Download links for the files a stage result points at."""
+    values = result.values() if isinstance(result, dict) else [result]
+    artifacts = []
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        path = BASE_DIR / value
+        # A PDF still rendering (or rendered on demand) is served once ready
+        pending_pdf = path.suffix == ".pdf" and path.with_suffix(".md").is_file()
+        if path.parent in (OUT_DIR, LINEAR_MOCK_DIR) and (path.is_file() or pending_pdf):
+            artifacts.append({"name": path.name, "download_url": f"/download/{path.name}"})
+    return artifacts
+
+def run_rca_job(stage, incident_file: str, *args) -> Dict[str, Any]:
+    """Write an RCA's markdown, leaving its PDF to the PDF pool."""
+    result = stage(incident_file, *args, pdf=False)
+    if PDF_MODE == "lazy":
+        result["pdf_status"] = "on_download"
+    else:
+        pdf_renderer.submit(result["markdown"], result["pdf"])
+        result["pdf_status"] = "rendering"
+    return result
+
+def run_demo_job(incident_file: str, publish) -> Dict[str, Any]:
+    """Run the demo graph, publishing a 'stage' event per step.
+
+    Finished steps carry their result (e.g. triage candidates) and links
+    to any artifacts they wrote. The job fails if any step failed.
+    """
+    def on_event(event: str, name: str, payload: Dict[str, Any]) -> None:
+        data = {"stage": name, "status": event}
+        if "kind" in payload:
+            data["kind"] = payload["kind"]
+        if "duration" in payload:
+            data["duration_ms"] = round(payload["duration"] * 1000, 3)
+        if "error" in payload:
+            data["error"] = payload["error"]
+        if event == "finish":
+            data["result"] = payload["result"]
+            data["artifacts"] = stage_artifacts(payload["result"])
+        publish("stage", data)
+
+    # PDF steps share the renderer's warm pool instead of spawning their own
+    run = run_demo(incident_file, on_event=on_event, executor=pdf_renderer.executor())
+    if run["errors"]:
+        failed = "; ".join(f"{name}: {error}" for name, error in sorted(run["errors"].items()))
+        raise RuntimeError(f"Demo failed at {failed}")
+    return run
+
+@app.post("/triage/{incident}", status_code=202)
+async def triage_incident(incident: str):
+    """Run triage analysis on an incident."""
+    return submit_job("triage", incident, run_triage, incident_file_for(incident))
+
+@app.post("/rca/initial/{incident}", status_code=202)
 async def generate_initial_rca(incident: str):
     """Generate initial RCA document."""
-    incident_file = f"incidents/{incident}.json"
-    if not (BASE_DIR / incident_file).exists():
-        raise HTTPException(status_code=404, detail=f"Incident file {incident_file} not found")
-    
-    command = ["python3", "-m", "rca.cli", "rca", incident_file, "--initial"]
-    result = run_cli_command(command)
-    
-    return {
-        "operation": "initial_rca",
-        "incident": incident,
-        "result": result,
-        "artifacts": list_artifacts_for_incident(incident)
-    }
+    return submit_job("initial_rca", incident, run_rca_job, run_initial_rca, incident_file_for(incident))
 
-@app.post("/apply-fix/{incident}")
+@app.post("/apply-fix/{incident}", status_code=202)
 async def apply_fix(incident: str):
     """Apply fixes and create commit."""
-    incident_file = f"incidents/{incident}.json"
-    if not (BASE_DIR / incident_file).exists():
-        raise HTTPException(status_code=404, detail=f"Incident file {incident_file} not found")
-    
-    command = ["python3", "-m", "rca.cli", "apply-fix", incident_file]
-    result = run_cli_command(command)
-    
-    return {
-        "operation": "apply_fix",
-        "incident": incident,
-        "result": result
-    }
+    return submit_job("apply_fix", incident, run_apply_fix, incident_file_for(incident))
 
-@app.post("/rca/final/{incident}")
+@app.post("/rca/final/{incident}", status_code=202)
 async def generate_final_rca(incident: str, fix_commit: str = "latest"):
-    """Generate final RCA document."""
-    incident_file = f"incidents/{incident}.json"
-    if not (BASE_DIR / incident_file).exists():
-        raise HTTPException(status_code=404, detail=f"Incident file {incident_file} not found")
-    
-    command = ["python3", "-m", "rca.cli", "rca", incident_file, "--final"]
-    if fix_commit != "latest":
-        command.extend(["--fix-commit", fix_commit])
-    
-    result = run_cli_command(command)
-    
-    return {
-        "operation": "final_rca",
-        "incident": incident,
-        "result": result,
-        "artifacts": list_artifacts_for_incident(incident)
-    }
+    """Generate final RCA document ("latest" uses the incident's fix branch)."""
+    commit = None if fix_commit == "latest" else fix_commit
+    return submit_job("final_rca", incident, run_rca_job, run_final_rca, incident_file_for(incident), commit)
 
-@app.post("/compare/{incident}")
-async def generate_comparison(incident: str):
-    """Generate before/after comparison document."""
-    incident_file = f"incidents/{incident}.json"
-    if not (BASE_DIR / incident_file).exists():
-        raise HTTPException(status_code=404, detail=f"Incident file {incident_file} not found")
-    
-    command = ["python3", "-m", "rca.cli", "compare", incident_file]
-    result = run_cli_command(command)
-    
-    return {
-        "operation": "compare",
-        "incident": incident,
-        "result": result,
-        "artifacts": list_artifacts_for_incident(incident)
-    }
+@app.post("/compare/{incident}", status_code=202)
+async def generate_comparison(incident: str, fix_commit: Optional[str] = None, context: Optional[int] = None):
+    """Generate before/after comparison document (context: lines around each diff hunk)."""
+    if context is not None and context < 0:
+        raise HTTPException(status_code=400, detail="context must not be negative")
+    return submit_job("compare", incident, run_compare, incident_file_for(incident), fix_commit, context)
 
-@app.post("/ticket/{incident}")
+@app.post("/draft-pr/{incident}", status_code=202)
+async def generate_pr_draft(incident: str):
+    """Generate PR draft."""
+    return submit_job("draft_pr", incident, run_draft_pr, incident_file_for(incident))
+
+@app.post("/ticket/{incident}", status_code=202)
 async def create_ticket(incident: str, team: str = "FTS"):
     """Create Linear ticket."""
-    incident_file = f"incidents/{incident}.json"
-    if not (BASE_DIR / incident_file).exists():
-        raise HTTPException(status_code=404, detail=f"Incident file {incident_file} not found")
-    
-    command = ["python3", "-m", "rca.cli", "ticket", incident_file, "--team", team]
-    result = run_cli_command(command)
-    
-    # List tickets
-    tickets = []
-    if LINEAR_MOCK_DIR.exists():
-        for ticket_file in LINEAR_MOCK_DIR.glob("*.json"):
-            tickets.append(ticket_file.name)
-    
-    return {
-        "operation": "create_ticket",
-        "incident": incident,
-        "team": team,
-        "result": result,
-        "tickets": tickets
-    }
+    response = submit_job("ticket", incident, run_ticket, incident_file_for(incident), team)
+    response["team"] = team
+    return response
 
-@app.post("/demo/{incident}")
+@app.post("/demo/{incident}", status_code=202)
 async def run_demo_pipeline(incident: str):
     """Run complete demo pipeline."""
-    incident_file = f"incidents/{incident}.json"
-    if not (BASE_DIR / incident_file).exists():
-        raise HTTPException(status_code=404, detail=f"Incident file {incident_file} not found")
-    
-    command = ["python3", "-m", "rca.cli", "demo", incident_file]
-    result = run_cli_command(command)
-    
+    return submit_job("demo", incident, run_demo_job, incident_file_for(incident), with_events=True)
+
+# Operations whose finished job lists the incident's documents / tickets
+ARTIFACT_OPERATIONS = {"initial_rca", "final_rca", "compare", "draft_pr", "demo"}
+TICKET_OPERATIONS = {"ticket", "demo"}
+
+@app.get("/jobs")
+async def list_jobs():
+    """List recent jobs and the per-operation concurrency limits."""
     return {
-        "operation": "demo_pipeline",
-        "incident": incident,
-        "result": result,
-        "artifacts": list_artifacts_for_incident(incident),
-        "tickets": list_tickets()
+        "jobs": [job.to_dict() for job in jobs.list()],
+        "limits": jobs.limits()
     }
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return a job's status, timings and result."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    data = job.to_dict()
+    if data["status"] == "succeeded":
+        if job.operation in ARTIFACT_OPERATIONS:
+            data["artifacts"] = list_artifacts_for_incident(job.incident)
+            # Link the job's PDF even before it has been rendered
+            listed = {artifact["name"] for artifact in data["artifacts"]}
+            data["artifacts"] += [artifact for artifact in stage_artifacts(data["result"])
+                                  if artifact["name"] not in listed]
+        if job.operation in TICKET_OPERATIONS:
+            data["tickets"] = list_tickets()
+    return data
+
+SSE_KEEPALIVE_SECONDS = 15.0
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+def format_sse(entry: Dict[str, Any]) -> str:
+    data = json.dumps(entry["data"], default=str)
+    return f"id: {entry['id']}\nevent: {entry['event']}\ndata: {data}\n\n"
+
+async def job_event_stream(job, after_id: int):
+    """Yield a job's events as SSE frames until it finishes."""
+    backlog, queue = job.events.subscribe(after_id)
+    try:
+        for entry in backlog:
+            yield format_sse(entry)
+            if entry["event"] == "job" and entry["data"]["status"] in TERMINAL_STATUSES:
+                return
+        while True:
+            try:
+                entry = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(entry)
+            if entry["event"] == "job" and entry["data"]["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        job.events.unsubscribe(queue)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Stream a job's progress as server-sent events.
+
+    'job' events report status changes (the last one carries the result);
+    demo jobs also send a 'stage' event per pipeline step. Reconnecting
+    clients resume after the Last-Event-ID header.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    try:
+        after_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        after_id = 0
+    return StreamingResponse(
+        job_event_stream(job, after_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/artifacts")
-async def list_artifacts():
+async def list_artifacts(request: Request):
     """List all generated artifacts."""
-    artifacts = {
-        "documents": [],
-        "tickets": [],
-        "total_size": 0
-    }
-    
-    # List documents in out/
-    if OUT_DIR.exists():
-        for file in OUT_DIR.iterdir():
-            if file.is_file():
-                stat = file.stat()
-                artifacts["documents"].append({
-                    "name": file.name,
-                    "size": stat.st_size,
-                    "modified": stat.st_mtime,
-                    "type": file.suffix,
-                    "download_url": f"/download/{file.name}"
-                })
-                artifacts["total_size"] += stat.st_size
-    
-    # List tickets in linear_mock/
-    artifacts["tickets"] = list_tickets()
+    def build():
+        documents = [
+            {
+                "name": entry["name"],
+                "size": entry["size"],
+                "modified": entry["modified"],
+                "type": entry["type"],
+                "download_url": f"/download/{entry['name']}"
+            }
+            for entry in artifact_index.entries()
+        ]
+        return {
+            "documents": documents,
+            "tickets": list_tickets(),
+            "total_size": sum(document["size"] for document in documents)
+        }
     
-    return artifacts
+    return cached_listing(request, listing_etag(artifact_index, ticket_index), build)
 
-@app.get("/download/{filename}")
-async def download_file(filename: str):
-    """Download an artifact file."""
-    # Check in out/ directory
-    file_path = OUT_DIR / filename
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='application/octet-stream'
-        )
-    
-    # Check in linear_mock/ directory
-    file_path = LINEAR_MOCK_DIR / filename
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='application/json'
-        )
-    
-    raise HTTPException(status_code=404, detail=f"File {filename} not found")
+def artifact_media_type(path: Path) -> str:
+    """Content type for a downloadable artifact."""
+    media_type, encoding = mimetypes.guess_type(path.name)
+    if encoding == "gzip":
+        return "application/gzip"
+    return media_type or "application/octet-stream"
+
+def accepts_gzip(request: Request) -> bool:
+    """True if Accept-Encoding allows gzip (q=0 refuses it).
+
+    An explicit gzip entry wins over a "*" wildcard.
+    """
+    weights = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        coding = coding.lower()
+        if coding not in ("gzip", "*"):
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights.setdefault(coding, q)
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+def not_modified(request: Request, response: FileResponse, st: os.stat_result) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since."""
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, response.headers["etag"])
+    since = request.headers.get("if-modified-since")
+    if not since:
+        return False
+    try:
+        since_time = parsedate_to_datetime(since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(st.st_mtime) <= since_time
+
+async def ensure_pdf(pdf_path: Path) -> None:
+    """Render a PDF from its markdown if it is missing or out of date."""
+    md_path = pdf_path.with_suffix(".md")
+    if not md_path.is_file():
+        return
+    relative_md, relative_pdf = (str(p.relative_to(BASE_DIR)) for p in (md_path, pdf_path))
+    try:
+        await asyncio.wrap_future(pdf_renderer.ensure(relative_md, relative_pdf))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF rendering failed: {e}")
+
+@app.api_route("/download/{filename}", methods=["GET", "HEAD"])
+async def download_file(filename: str, request: Request):
+    """Download an artifact file.
+
+    FileResponse streams the file in chunks (or hands it to the server via
+    the ASGI pathsend extension) and answers Range/If-Range requests.
+    Markdown and JSON are served from their gzip copy when the client
+    accepts it and is not asking for a range. A PDF that is missing or
+    older than its markdown is rendered (or awaited) first.
+    """
+    for directory in (OUT_DIR, LINEAR_MOCK_DIR):
+        file_path = directory / filename
+        if file_path.parent != directory:
+            continue
+        if file_path.is_file() or (file_path.suffix == ".pdf" and file_path.with_suffix(".md").is_file()):
+            break
+    else:
+        raise HTTPException(status_code=404, detail=f"File {filename} not found")
+
+    if file_path.suffix == ".pdf" and directory == OUT_DIR:
+        await ensure_pdf(file_path)
+
+    media_type = artifact_media_type(file_path)
+    headers = {"Cache-Control": "no-cache"}
+    if file_path.suffix in PRECOMPRESS_SUFFIXES:
+        headers["Vary"] = "Accept-Encoding"
+        gz_path = None
+        if "range" not in request.headers and accepts_gzip(request):
+            gz_path = fresh_precompressed(file_path, BASE_DIR)
+        if gz_path:
+            headers["Content-Encoding"] = "gzip"
+            file_path = Path(gz_path)
+
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        raise HTTPException(status_code=404, detail=f"File {filename} not found")
+    response = FileResponse(
+        path=file_path,
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        stat_result=st
+    )
+    if not_modified(request, response, st):
+        return Response(status_code=304, headers={
+            key: response.headers[key]
+            for key in ("etag", "last-modified", "cache-control", "vary", "content-encoding")
+            if key in response.headers
+        })
+    return response
+
+@app.get("/bundle")
+async def download_bundle(incidents: str, format: str = "zip"):
+    """Stream the artifacts of several incidents as one archive.
+
+    ``incidents`` is a comma-separated list of incident IDs; ``format`` is
+    zip, tar or tgz. RCA PDFs that are missing or stale are rendered
+    first; the archive itself is written while it is sent, never staged.
+    """
+    if format not in BUNDLE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown bundle format {format}; "
+                                                    f"use one of {', '.join(BUNDLE_FORMATS)}")
+    incident_ids = list(dict.fromkeys(i.strip() for i in incidents.split(",") if i.strip()))
+    if not incident_ids or any(i != Path(i).name or i.startswith(".") for i in incident_ids):
+        raise HTTPException(status_code=400, detail="incidents must be a comma-separated list of incident IDs")
+
+    await asyncio.gather(*(ensure_pdf(Path(pdf_path)) for pdf_path in rca_pdf_paths(incident_ids, OUT_DIR)))
+    files = bundle_files(incident_ids, str(OUT_DIR), str(LINEAR_MOCK_DIR))
+    if not files:
+        raise HTTPException(status_code=404, detail=f"No artifacts found for {', '.join(incident_ids)}")
+
+    filename = bundle_filename(incident_ids, format)
+    return StreamingResponse(
+        iter_bundle(files, format),
+        media_type=BUNDLE_FORMATS[format][1],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-cache"
+        }
+    )
 
 def list_artifacts_for_incident(incident: str) -> List[Dict[str, Any]]:
     """List artifacts for a specific incident."""
-    artifacts = []
-    if OUT_DIR.exists():
-        for file in OUT_DIR.glob(f"{incident}*"):
-            if file.is_file():
-                stat = file.stat()
-                artifacts.append({
-                    "name": file.name,
-                    "size": stat.st_size,
-                    "type": file.suffix,
-                    "download_url": f"/download/{file.name}"
-                })
-    return artifacts
+    return [
+        {
+            "name": entry["name"],
+            "size": entry["size"],
+            "type": entry["type"],
+            "download_url": f"/download/{entry['name']}"
+        }
+        for entry in artifact_index.group(incident)
+    ]
 
 def list_tickets() -> List[Dict[str, Any]]:
     """List all tickets."""
-    tickets = []
-    if LINEAR_MOCK_DIR.exists():
-        for ticket_file in LINEAR_MOCK_DIR.glob("*.json"):
-            try:
-                with open(ticket_file, 'r') as f:
-                    data = json.load(f)
-                tickets.append({
-                    "filename": ticket_file.name,
-                    "id": data.get("id", ticket_file.stem),
-                    "title": data.get("title", "Unknown"),
-                    "team": data.get("team", "Unknown"),
-                    "status": data.get("status", "Unknown"),
-                    "download_url": f"/download/{ticket_file.name}"
-                })
-            except Exception as e:
-                logger.warning(f"Failed to parse ticket {ticket_file}: {e}")
-    return tickets
+    return [entry["data"] for entry in ticket_index.entries()]
 
 if __name__ == "__main__":
     import uvicorn
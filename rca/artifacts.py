@@ -0,0 +1,128 @@
+"""Write text artifacts along with gzip copies for the download endpoint."""
+import gzip
+import os
+import threading
+from contextlib import ExitStack
+from typing import Iterable, Iterator, Optional, Union
+from .loaders import CACHE_DIR
+
+GZIP_DIR = f'{CACHE_DIR}/gzip'
+# Text artifacts worth compressing; PDFs are already compressed
+PRECOMPRESS_SUFFIXES = ('.md', '.json')
+# Compressed once at write time and served many times, so use the best ratio
+GZIP_LEVEL = 9
+# Streamed chunks are batched into writes of about this many characters
+WRITE_BUFFER_CHARS = 64 * 1024
+
+PathLike = Union[str, os.PathLike]
+
+
+def precompressed_path(path: PathLike, base_dir: PathLike = '.') -> Optional[str]:
+    """Location of the gzip copy of path, or None if path is outside base_dir.
+
+    Copies live under .rca_cache/gzip/ mirroring the artifact's path
+    relative to base_dir (``out/X.md`` -> ``.rca_cache/gzip/out/X.md.gz``)
+    so they never show up in artifact listings or commits.
+    """
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(base_dir))
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return None
+    return os.path.join(base_dir, GZIP_DIR, relative + '.gz')
+
+
+def precompress(path: PathLike) -> Optional[str]:
+    """Write the gzip copy of a markdown/JSON artifact; returns its path.
+
+    The copy is written atomically and stamped with the artifact's mtime,
+    which is how fresh_precompressed() tells it is current.
+    """
+    if not str(path).endswith(PRECOMPRESS_SUFFIXES):
+        return None
+    gz_path = precompressed_path(path)
+    if gz_path is None:
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    os.makedirs(os.path.dirname(gz_path), exist_ok=True)
+    tmp_path = f"{gz_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    os.replace(tmp_path, gz_path)
+    st = os.stat(path)
+    os.utime(gz_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return gz_path
+
+
+def fresh_precompressed(path: PathLike, base_dir: PathLike = '.') -> Optional[str]:
+    """The gzip copy of path if it matches the artifact's current mtime."""
+    gz_path = precompressed_path(path, base_dir)
+    if gz_path is None:
+        return None
+    try:
+        if os.stat(gz_path).st_mtime_ns != os.stat(path).st_mtime_ns:
+            return None
+    except OSError:
+        return None
+    return gz_path
+
+
+def _encoded_blocks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Re-cut text chunks into UTF-8 blocks of about WRITE_BUFFER_CHARS.
+
+    Small chunks are joined and large ones sliced, so there are neither
+    tiny writes nor copies of a whole huge chunk.
+    """
+    pending, pending_chars = [], 0
+    for chunk in chunks:
+        if pending_chars + len(chunk) >= WRITE_BUFFER_CHARS:
+            if pending:
+                yield ''.join(pending).encode('utf-8')
+                pending, pending_chars = [], 0
+            if len(chunk) >= WRITE_BUFFER_CHARS:
+                for start in range(0, len(chunk), WRITE_BUFFER_CHARS):
+                    yield chunk[start:start + WRITE_BUFFER_CHARS].encode('utf-8')
+                continue
+        pending.append(chunk)
+        pending_chars += len(chunk)
+    if pending:
+        yield ''.join(pending).encode('utf-8')
+
+
+def write_artifact_chunks(path: PathLike, chunks: Iterable[str]) -> None:
+    """Stream text chunks into an artifact and its gzip copy in one pass.
+
+    Both files are written under temporary names and renamed into place,
+    so readers never see a partially rendered document.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    gz_path = precompressed_path(path) if str(path).endswith(PRECOMPRESS_SUFFIXES) else None
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp_path = f"{path}{suffix}"
+    try:
+        with ExitStack() as stack:
+            out = stack.enter_context(open(tmp_path, 'wb'))
+            gz = None
+            if gz_path is not None:
+                os.makedirs(os.path.dirname(gz_path), exist_ok=True)
+                gz_file = stack.enter_context(open(gz_path + suffix, 'wb'))
+                gz = stack.enter_context(gzip.GzipFile(filename='', fileobj=gz_file, mode='wb',
+                                                       compresslevel=GZIP_LEVEL, mtime=0))
+            for data in _encoded_blocks(chunks):
+                out.write(data)
+                if gz is not None:
+                    gz.write(data)
+    except BaseException:
+        for leftover in (tmp_path, gz_path and gz_path + suffix):
+            if leftover and os.path.exists(leftover):
+                os.unlink(leftover)
+        raise
+    os.replace(tmp_path, path)
+    if gz_path is not None:
+        os.replace(gz_path + suffix, gz_path)
+        st = os.stat(path)
+        os.utime(gz_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def write_text_artifact(path: PathLike, content: str) -> None:
+    """Write a text artifact and its gzip copy."""
+    write_artifact_chunks(path, [content])
@@ -0,0 +1,212 @@
+"""Stream every artifact of a set of incidents as one zip or tar archive."""
+import gzip
+import json
+import os
+import tarfile
+import time
+import zipfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from .dirindex import IGNORED_SUFFIXES
+
+# format -> (file extension, media type)
+BUNDLE_FORMATS = {
+    'zip': ('zip', 'application/zip'),
+    'tar': ('tar', 'application/x-tar'),
+    'tgz': ('tar.gz', 'application/gzip'),
+}
+# RCA documents that also have a PDF rendered from their markdown
+RCA_PDF_DOCUMENTS = ('initial_rca', 'final_rca')
+# Already compressed, so stored as-is in zip bundles
+STORED_SUFFIXES = ('.pdf', '.gz')
+READ_CHUNK_SIZE = 64 * 1024
+TICKET_INCIDENT_PREFIX = '## Incident: '
+
+# (path on disk, name inside the archive)
+BundleFile = Tuple[str, str]
+
+
+def _ticket_incident(ticket_path: str) -> Optional[str]:
+    # Mock tickets only name their incident in the description's first line
+    try:
+        with open(ticket_path, 'r') as f:
+            description = json.load(f).get('description') or ''
+    except (OSError, ValueError, AttributeError):
+        return None
+    first_line = description.split('\n', 1)[0]
+    if first_line.startswith(TICKET_INCIDENT_PREFIX):
+        return first_line[len(TICKET_INCIDENT_PREFIX):].strip()
+    return None
+
+
+def rca_pdf_paths(incident_ids: Iterable[str], out_dir: str = 'out') -> List[str]:
+    """PDF paths of the incidents' RCA documents whose markdown exists.
+
+    The PDFs themselves may be missing or stale (they are rendered in the
+    background or on first download); callers bring them up to date
+    before bundling.
+    """
+    paths = []
+    for incident_id in incident_ids:
+        for document in RCA_PDF_DOCUMENTS:
+            md_path = os.path.join(out_dir, f'{incident_id}_{document}.md')
+            if os.path.isfile(md_path):
+                paths.append(md_path[:-len('.md')] + '.pdf')
+    return paths
+
+
+def bundle_files(incident_ids: Iterable[str], out_dir: str = 'out',
+                 ticket_dir: str = 'linear_mock') -> List[BundleFile]:
+    """Artifacts of the incidents, in a stable order.
+
+    Documents in out_dir (``<incident>_*``) are archived as
+    ``<incident>/<name>`` and the incident's mock tickets as
+    ``<incident>/tickets/<name>``.
+    """
+    incident_ids = list(dict.fromkeys(incident_ids))
+    documents: Dict[str, List[str]] = {incident_id: [] for incident_id in incident_ids}
+    tickets: Dict[str, List[str]] = {incident_id: [] for incident_id in incident_ids}
+
+    if os.path.isdir(out_dir):
+        for name in sorted(os.listdir(out_dir)):
+            incident_id = name.split('_', 1)[0]
+            if (incident_id in documents and '_' in name and not name.endswith(IGNORED_SUFFIXES)
+                    and os.path.isfile(os.path.join(out_dir, name))):
+                documents[incident_id].append(name)
+    if os.path.isdir(ticket_dir):
+        for name in sorted(os.listdir(ticket_dir)):
+            if not name.endswith('.json'):
+                continue
+            incident_id = _ticket_incident(os.path.join(ticket_dir, name))
+            if incident_id in tickets:
+                tickets[incident_id].append(name)
+
+    files = []
+    for incident_id in incident_ids:
+        files += [(os.path.join(out_dir, name), f'{incident_id}/{name}')
+                  for name in documents[incident_id]]
+        files += [(os.path.join(ticket_dir, name), f'{incident_id}/tickets/{name}')
+                  for name in tickets[incident_id]]
+    return files
+
+
+class _Sink:
+    """Write-only, non-seekable file object whose bytes the generator drains.
+
+    zipfile falls back to data descriptors and tarfile-style output needs
+    no seeking, so only what was written since the last drain is held.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _read_exactly(f, size: int) -> Iterator[bytes]:
+    # The size was announced in the member header already, so a file that
+    # shrank while being read is padded rather than corrupting the archive
+    remaining = size
+    while remaining:
+        block = f.read(min(READ_CHUNK_SIZE, remaining)) or b'\0' * min(READ_CHUNK_SIZE, remaining)
+        remaining -= len(block)
+        yield block
+
+
+def _open_members(files: List[BundleFile]) -> Iterator[Tuple[BinaryIO, os.stat_result, str, str]]:
+    # Files deleted since they were listed are left out of the archive
+    for path, arcname in files:
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            continue
+        with f:
+            yield f, os.fstat(f.fileno()), path, arcname
+
+
+def _zip_members(files: List[BundleFile], sink: _Sink) -> Iterator[None]:
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for f, st, path, arcname in _open_members(files):
+            # Zip timestamps cannot predate 1980
+            date_time = max(time.localtime(st.st_mtime)[:6], (1980, 1, 1, 0, 0, 0))
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            info.file_size = st.st_size
+            info.external_attr = 0o644 << 16
+            info.compress_type = (zipfile.ZIP_STORED if path.endswith(STORED_SUFFIXES)
+                                  else zipfile.ZIP_DEFLATED)
+            with archive.open(info, 'w') as member:
+                for block in _read_exactly(f, st.st_size):
+                    member.write(block)
+                    yield
+    yield
+
+
+def _tar_members(files: List[BundleFile], out) -> Iterator[None]:
+    written = 0
+    for f, st, _, arcname in _open_members(files):
+        info = tarfile.TarInfo(arcname)
+        info.size = st.st_size
+        info.mtime = int(st.st_mtime)
+        info.mode = 0o644
+        header = info.tobuf(tarfile.PAX_FORMAT)
+        out.write(header)
+        written += len(header)
+        for block in _read_exactly(f, st.st_size):
+            out.write(block)
+            yield
+        padding = -st.st_size % tarfile.BLOCKSIZE
+        out.write(b'\0' * padding)
+        written += st.st_size + padding
+    # End-of-archive marker, then pad to a whole record as tarfile does
+    written += 2 * tarfile.BLOCKSIZE
+    out.write(b'\0' * (2 * tarfile.BLOCKSIZE + -written % tarfile.RECORDSIZE))
+    yield
+
+
+def _tgz_members(files: List[BundleFile], sink: _Sink) -> Iterator[None]:
+    with gzip.GzipFile(filename='', fileobj=sink, mode='wb', mtime=0) as out:
+        yield from _tar_members(files, out)
+    yield
+
+
+_WRITERS = {'zip': _zip_members, 'tar': _tar_members, 'tgz': _tgz_members}
+
+
+def iter_bundle(files: List[BundleFile], fmt: str = 'zip') -> Iterator[bytes]:
+    """Yield the archive of files as it is written.
+
+    Each file is read in READ_CHUNK_SIZE blocks and its compressed bytes
+    are handed out as soon as they exist, so neither the archive nor any
+    one artifact is ever held in memory or staged on disk.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown bundle format {fmt!r} (expected one of {', '.join(BUNDLE_FORMATS)})")
+    sink = _Sink()
+    for _ in _WRITERS[fmt](files, sink):
+        data = sink.drain()
+        if data:
+            yield data
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def bundle_filename(incident_ids: List[str], fmt: str = 'zip') -> str:
+    """Download/file name for a bundle of the given incidents."""
+    label = incident_ids[0] if len(incident_ids) == 1 else f'{len(incident_ids)}-incidents'
+    return f'rca-bundle-{label}.{BUNDLE_FORMATS[fmt][0]}'
@@ -1,38 +1,61 @@
 """Command line tool with subcommands to run the whole flow."""
 import argparse
+import json
+import os
+import subprocess
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-
-from .loaders import load_incident
-from .correlate import get_top_candidate
-from .scoring import score_candidates, format_candidate_report
-from .analyze import (
-    analyze_code, compute_tat, generate_five_whys, 
-    generate_candidate_fixes, get_owners, generate_validations, generate_prevention
-)
-from .schema import RCAData
-from .rca_writer import export_rca_documents, export_final_rca_documents
-from .pr_draft import generate_pr_draft
-from .linear_client import create_ticket_from_rca
-from .gitutils import setup_git_history, apply_fix_commit
-from .comparison_doc import generate_comparison_doc
-from .finalizer import finalize_rca_data, update_incident_resolved_time
-
-console = Console()
+
+# Subcommand modules (pipeline, PDF/Jinja writers, Linear client, process
+# pools) are imported inside the commands that use them, so a `triage` run
+# does not pay for reportlab or requests at startup.
+
+
+class _ConsoleSwitch:
+    """Console that forwards to a per-thread override when one is bound.
+
+    The worker daemon runs commands on several threads at once and binds a
+    capturing console for each job; everything else prints to the terminal.
+    """
+
+    def __init__(self):
+        self._default = Console()
+        self._local = threading.local()
+
+    def current(self) -> Console:
+        return getattr(self._local, 'console', None) or self._default
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+    @contextmanager
+    def bind(self, bound: Console):
+        previous = getattr(self._local, 'console', None)
+        self._local.console = bound
+        try:
+            yield bound
+        finally:
+            self._local.console = previous
+
+
+console = _ConsoleSwitch()
 
 
 def cmd_init(args):
     """Initialize git repository and setup."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from .gitutils import setup_git_history
+
     console.print("[bold blue]Initializing RCA Agent...[/bold blue]")
     
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        console=console,
+        console=console.current(),
     ) as progress:
         task = progress.add_task("Setting up git repository...", total=None)
         
@@ -48,13 +71,15 @@ def cmd_init(args):
 
 def cmd_triage(args):
     """Triage incident and show candidate analysis."""
+    from rich.table import Table
+    from .pipeline import load_analysis
+
     console.print(f"[bold blue]Triaging incident: {args.incident_file}[/bold blue]")
     
-    # Load incident
-    incident = load_incident(args.incident_file)
-    
-    # Score candidates
-    candidates = score_candidates(incident)
+    # Triage + analysis run once and are persisted for later subcommands
+    analysis = load_analysis(args.incident_file)
+    incident = analysis.rca.incident
+    candidates = analysis.candidates
     
     # Display results
     console.print(f"\n[bold green]Incident: {incident.id}[/bold green]")
@@ -78,10 +103,16 @@ def cmd_triage(args):
             if len(candidate.reasons) > 2:
                 reasons += f" (+{len(candidate.reasons)-2} more)"
             
+            location = candidate.file
+            if candidate.function:
+                location += f"#{candidate.function}"
+                if candidate.line_start:
+                    location += f" (L{candidate.line_start}-{candidate.line_end})"
+            
             table.add_row(
                 str(i),
                 candidate.repo,
-                candidate.file,
+                location,
                 str(candidate.score),
                 reasons
             )
@@ -95,131 +126,99 @@ def cmd_triage(args):
         console.print("❌ No candidates found")
 
 
+def _init_triage_worker():
+    """Prepare a batch worker: one log scan per process, warm data maps."""
+    from .loaders import get_knowledge_base
+
+    kb = get_knowledge_base()
+    kb.log_source.workers = 1
+    for name in kb.SOURCES:
+        kb.get(name)
+
+
+def _triage_file(incident_file: str) -> dict:
+    """Triage one incident file and return a JSON-serializable result."""
+    from .loaders import load_incident
+    from .scoring import score_candidates
+
+    started = time.perf_counter()
+    try:
+        incident = load_incident(incident_file)
+        candidates = score_candidates(incident)
+        result = {
+            'incident': incident.id,
+            'file': incident_file,
+            'candidates': [c.model_dump() for c in candidates],
+        }
+    except Exception as e:
+        result = {'incident': None, 'file': incident_file, 'error': str(e)}
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def _triage_files(incident_files: list) -> list:
+    """Triage a chunk of incident files in one worker round-trip."""
+    return [_triage_file(f) for f in incident_files]
+
+
+def cmd_triage_batch(args):
+    """Triage every incident in a directory and stream NDJSON results."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    incident_files = sorted(str(p) for p in Path(args.incidents_dir).glob('*.json'))
+    workers = args.workers or os.cpu_count() or 1
+
+    # Load the knowledge base once; forked workers inherit it
+    _init_triage_worker()
+
+    # Several small chunks per worker keeps IPC overhead low while still
+    # streaming results early and balancing uneven incidents
+    chunk_size = max(1, min(32, len(incident_files) // (workers * 4)))
+    chunks = [incident_files[i:i + chunk_size] for i in range(0, len(incident_files), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_triage_worker) as pool:
+        futures = [pool.submit(_triage_files, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for result in future.result():
+                sys.stdout.write(json.dumps(result) + "\n")
+            sys.stdout.flush()
+
+
 def cmd_rca(args):
     """Generate RCA document."""
+    from .pipeline import run_initial_rca, run_final_rca
+
     console.print(f"[bold blue]Generating RCA for: {args.incident_file}[/bold blue]")
     
-    # Load incident
-    incident = load_incident(args.incident_file)
-    
-    # Get top candidate
-    suspect = get_top_candidate(incident)
-    
-    # Analyze code
-    observations = analyze_code(incident, suspect)
-    
-    # Generate analysis components
-    whys = generate_five_whys(incident, suspect, observations)
-    diffs = generate_candidate_fixes(incident, suspect, observations)
-    validations = generate_validations(incident, observations)
-    prevention = generate_prevention(incident, observations)
-    owners = get_owners(incident)
-    tat = compute_tat(incident)
-    
-    # Create RCA data
-    rca_data = RCAData(
-        incident=incident,
-        suspect=suspect,
-        summary=f"Analysis of {incident.title} - {incident.error_message}",
-        created_at=incident.created_at,
-        resolved_at=incident.resolved_at,
-        tat=tat,
-        impact=incident.impact,
-        whys=whys,
-        observations=observations,
-        diffs=diffs,
-        validations=validations,
-        prevention=prevention,
-        owners=owners
-    )
-    
     if args.initial:
         # Generate initial RCA
-        result = export_rca_documents(rca_data)
+        result = run_initial_rca(args.incident_file)
         console.print(f"✅ Initial RCA generated:")
         console.print(f"📄 Markdown: {result['markdown']}")
         console.print(f"📄 PDF: {result['pdf']}")
         
     elif args.final and args.fix_commit:
         # Generate final RCA
-        fix_info = finalize_rca_data(rca_data, args.fix_commit)
-        
-        result = export_final_rca_documents(
-            rca_data, 
-            fix_info['fix_commit'], 
-            fix_info['files_changed'], 
-            fix_info['fix_summary']
-        )
-        
+        result = run_final_rca(args.incident_file, args.fix_commit)
         console.print(f"✅ Final RCA generated:")
         console.print(f"📄 Markdown: {result['markdown']}")
         console.print(f"📄 PDF: {result['pdf']}")
         
-        # Update incident as resolved
-        update_incident_resolved_time(args.incident_file)
-        
     else:
         console.print("❌ Please specify --initial or --final with --fix-commit")
 
 
 def cmd_draft_pr(args):
     """Generate PR draft."""
+    from .pipeline import run_draft_pr
+
     console.print(f"[bold blue]Generating PR draft for: {args.incident_file}[/bold blue]")
     
-    # Load incident and generate RCA data (simplified)
-    incident = load_incident(args.incident_file)
-    suspect = get_top_candidate(incident)
-    observations = analyze_code(incident, suspect)
-    diffs = generate_candidate_fixes(incident, suspect, observations)
-    validations = generate_validations(incident, observations)
-    
-    rca_data = RCAData(
-        incident=incident,
-        suspect=suspect,
-        summary=f"Fix for {incident.title}",
-        created_at=incident.created_at,
-        resolved_at=incident.resolved_at,
-        tat=compute_tat(incident),
-        impact=incident.impact,
-        whys=[],
-        observations=observations,
-        diffs=diffs,
-        validations=validations,
-        prevention=[],
-        owners=get_owners(incident)
-    )
-    
-    result = generate_pr_draft(rca_data)
+    result = run_draft_pr(args.incident_file)
     console.print(f"✅ PR draft generated: {result['path']}")
 
 
-def cmd_ticket(args):
-    """Create Linear ticket."""
-    console.print(f"[bold blue]Creating ticket for: {args.incident_file}[/bold blue]")
-    
-    # Load incident and generate RCA data (simplified)
-    incident = load_incident(args.incident_file)
-    suspect = get_top_candidate(incident)
-    observations = analyze_code(incident, suspect)
-    
-    rca_data = RCAData(
-        incident=incident,
-        suspect=suspect,
-        summary=f"RCA for {incident.title}",
-        created_at=incident.created_at,
-        resolved_at=incident.resolved_at,
-        tat=compute_tat(incident),
-        impact=incident.impact,
-        whys=[],
-        observations=observations,
-        diffs=[],
-        validations=[],
-        prevention=[],
-        owners=get_owners(incident)
-    )
-    
-    result = create_ticket_from_rca(incident.id, rca_data, args.team)
-    
+def _print_ticket_result(result: dict) -> None:
     if result['success']:
         console.print(f"✅ {result['message']}")
         if result['type'] == 'mock':
@@ -228,93 +227,236 @@ def cmd_ticket(args):
         console.print(f"❌ Failed to create ticket: {result['error']}")
 
 
+def cmd_ticket(args):
+    """Create Linear ticket."""
+    from .pipeline import run_ticket
+
+    console.print(f"[bold blue]Creating ticket for: {args.incident_file}[/bold blue]")
+    
+    _print_ticket_result(run_ticket(args.incident_file, args.team))
+
+
 def cmd_apply_fix(args):
     """Apply fixes and create fix commit."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from .pipeline import run_apply_fix
+
     console.print(f"[bold blue]Applying fixes for: {args.incident_file}[/bold blue]")
     
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        console=console,
+        console=console.current(),
     ) as progress:
         task = progress.add_task("Applying fixes...", total=None)
         
-        fix_commit = apply_fix_commit()
+        result = run_apply_fix(args.incident_file)
+        fix_commit = result['fix_commit']
         
         progress.update(task, description="Fixes applied and committed")
     
-    console.print(f"✅ Fixes applied and committed")
+    if result['changed']:
+        console.print(f"✅ Fixes applied and committed")
+    else:
+        console.print(f"ℹ️  Files already hold the fixes; no fix commit was needed")
+    console.print(f"🌿 Fix branch: {result['branch']}")
     console.print(f"🔧 Fix commit: {fix_commit[:8]}")
     console.print(fix_commit)  # Print full hash for use in final RCA
+    return fix_commit
 
 
 def cmd_compare(args):
     """Generate comparison document."""
+    from .pipeline import run_compare
+
     console.print(f"[bold blue]Generating comparison for: {args.incident_file}[/bold blue]")
     
-    # Load incident
-    incident = load_incident(args.incident_file)
-    suspect = get_top_candidate(incident)
-    
-    # Generate comparison (using a dummy fix commit for demo)
-    result = generate_comparison_doc(
-        incident.id, 
-        suspect.repo, 
-        suspect.file, 
-        "fix_commit_hash"
-    )
-    
+    result = run_compare(args.incident_file, getattr(args, 'fix_commit', None),
+                         getattr(args, 'context', None))
     console.print(f"✅ Comparison document generated: {result['path']}")
+    console.print(f"📝 {result['lines_added']} lines added, {result['lines_removed']} removed")
+
+
+def cmd_export_bundle(args):
+    """Write the artifacts of several incidents to one zip/tar archive."""
+    from .bundle import bundle_filename, bundle_files, iter_bundle, rca_pdf_paths
+    from .pdfs import render_pdf
+
+    # Incident JSON paths are accepted as well as bare IDs
+    incident_ids = list(dict.fromkeys(
+        Path(incident).stem if incident.endswith('.json') else incident for incident in args.incidents
+    ))
+    for pdf_path in rca_pdf_paths(incident_ids):
+        if render_pdf(pdf_path[:-len('.pdf')] + '.md', pdf_path)['rendered']:
+            console.print(f"📄 Rendered {pdf_path}")
+
+    files = bundle_files(incident_ids)
+    if not files:
+        raise RuntimeError(f"No artifacts found for {', '.join(incident_ids)}")
+
+    if args.output == '-':
+        for chunk in iter_bundle(files, args.format):
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return
+
+    output = args.output or bundle_filename(incident_ids, args.format)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in iter_bundle(files, args.format):
+                f.write(chunk)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    console.print(f"📦 Bundled {len(files)} files for {len(incident_ids)} incident(s): {output}")
+
+
+def cmd_index_logs(args):
+    """Build or incrementally update the persistent log index."""
+    from .logindex import LogIndex
+
+    index = LogIndex(args.index) if args.index else LogIndex()
+    for log_path in args.log_files:
+        console.print(f"[bold blue]Indexing logs: {log_path}[/bold blue]")
+        result = index.update(log_path)
+        mode = "rebuilt" if result['rebuilt'] else "appended"
+        console.print(f"✅ {result['rows_added']} rows indexed ({mode}), "
+                      f"offset {result['indexed_offset']}")
+    console.print(f"📁 Index: {index.index_path}")
+
+
+def _print_demo_event(event: str, name: str, payload: dict) -> None:
+    if event == 'start':
+        console.print(f"[blue]▶ {name}[/blue] [dim]({payload['kind']})[/dim]")
+    elif event == 'finish':
+        console.print(f"[green]✅ {name}[/green] [dim]{payload['duration']:.2f}s[/dim]")
+    elif event == 'error':
+        console.print(f"[red]❌ {name}: {payload['error']}[/red]")
+    elif event == 'skip':
+        console.print(f"[yellow]⏭  {name} skipped (dependency failed)[/yellow]")
 
 
 def cmd_demo(args):
     """Run complete demo workflow."""
+    from rich.table import Table
+    from .pipeline import run_demo
+
     console.print("[bold green]🚀 Running complete RCA Agent demo...[/bold green]")
     
-    incident_file = args.incident_file
-    
-    # Step 1: Initialize
-    console.print("\n[bold blue]Step 1: Initialize[/bold blue]")
-    cmd_init(argparse.Namespace())
-    
-    # Step 2: Triage
-    console.print("\n[bold blue]Step 2: Triage[/bold blue]")
-    cmd_triage(argparse.Namespace(incident_file=incident_file))
-    
-    # Step 3: Initial RCA
-    console.print("\n[bold blue]Step 3: Initial RCA[/bold blue]")
-    cmd_rca(argparse.Namespace(incident_file=incident_file, initial=True, final=False, fix_commit=None))
-    
-    # Step 4: PR Draft
-    console.print("\n[bold blue]Step 4: PR Draft[/bold blue]")
-    cmd_draft_pr(argparse.Namespace(incident_file=incident_file))
+    run = run_demo(args.incident_file, on_event=_print_demo_event)
     
-    # Step 5: Ticket
-    console.print("\n[bold blue]Step 5: Create Ticket[/bold blue]")
-    cmd_ticket(argparse.Namespace(incident_file=incident_file, team="FTS"))
+    table = Table(title="Pipeline Timings")
+    table.add_column("Step", style="cyan")
+    table.add_column("Kind", style="magenta")
+    table.add_column("Start", justify="right")
+    table.add_column("Duration", justify="right", style="green")
+    for name, timing in sorted(run['timings'].items(), key=lambda item: item[1]['start']):
+        table.add_row(name, timing['kind'], f"{timing['start']:.2f}s", f"{timing['duration']:.2f}s")
+    console.print(table)
     
-    # Step 6: Apply Fix
-    console.print("\n[bold blue]Step 6: Apply Fix[/bold blue]")
-    fix_result = cmd_apply_fix(argparse.Namespace(incident_file=incident_file))
+    serial = sum(timing['duration'] for timing in run['timings'].values())
+    console.print(f"Wall clock: {run['wall_time']:.2f}s (steps sum to {serial:.2f}s)")
     
-    # Get the fix commit hash (in real implementation, this would be returned)
-    from .gitutils import get_current_commit_hash
-    fix_commit = get_current_commit_hash()
+    if run['errors']:
+        failed = ', '.join(sorted(run['errors']))
+        raise RuntimeError(f"Demo failed at: {failed}")
     
-    # Step 7: Final RCA
-    console.print("\n[bold blue]Step 7: Final RCA[/bold blue]")
-    cmd_rca(argparse.Namespace(incident_file=incident_file, initial=False, final=True, fix_commit=fix_commit))
-    
-    # Step 8: Comparison
-    console.print("\n[bold blue]Step 8: Comparison[/bold blue]")
-    cmd_compare(argparse.Namespace(incident_file=incident_file))
+    triage = run['results']['triage']
+    suspect = triage['suspect']
+    console.print(f"Suspect: [bold]{suspect['repo']}/{suspect['file']}[/bold] (score {suspect['score']:.1f})")
+    _print_ticket_result(run['results']['ticket'])
+    console.print(f"Fix commit: {run['results']['apply_fix']['fix_commit']}")
     
     console.print("\n[bold green]🎉 Demo completed! Check the 'out/' directory for generated documents.[/bold green]")
 
 
-def main():
-    """Main CLI entry point."""
+def cmd_worker(args):
+    """Run the long-lived worker daemon."""
+    from .worker import default_socket_path, serve
+
+    socket_path = args.socket or default_socket_path()
+    console.print(f"[bold blue]Warming up worker...[/bold blue]")
+    serve(socket_path, on_ready=lambda: console.print(f"✅ Worker listening on {socket_path}"))
+
+
+def measure_startup(argv: list) -> dict:
+    """Run `python -m rca.cli <argv>` under -X importtime and parse the report.
+
+    Returns the child's exit code and output plus one entry per imported
+    module (self and cumulative microseconds, nesting depth) and the total
+    import time in seconds (sum of the top-level cumulative times).
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'rca.cli'] + list(argv),
+        capture_output=True, text=True
+    )
+    modules = []
+    other_stderr = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            if not line.startswith('import time:'):
+                other_stderr.append(line)
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        stripped = name.lstrip(' ')
+        modules.append({
+            'module': stripped,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': (len(name) - len(stripped) - 1) // 2,
+        })
+    top_level = [m for m in modules if m['depth'] == 0]
+    return {
+        'returncode': proc.returncode,
+        'stdout': proc.stdout,
+        'stderr': "\n".join(other_stderr),
+        'modules': modules,
+        'import_seconds': sum(m['cumulative_us'] for m in top_level) / 1e6,
+    }
+
+
+def cmd_startup_report(argv: list, limit: int = 20) -> int:
+    """Run a command and print where its startup import time went."""
+    from rich.table import Table
+
+    started = time.perf_counter()
+    report = measure_startup(argv)
+    elapsed = time.perf_counter() - started
+
+    sys.stdout.write(report['stdout'])
+    if report['stderr']:
+        sys.stderr.write(report['stderr'] + "\n")
+
+    # Attribute self time to packages so e.g. all of pydantic shows as one row;
+    # rca modules are listed individually since those are what we control
+    by_package = {}
+    for module in report['modules']:
+        name = module['module']
+        key = name if name.startswith('rca.') else name.split('.', 1)[0]
+        entry = by_package.setdefault(key, {'self_us': 0, 'count': 0})
+        entry['self_us'] += module['self_us']
+        entry['count'] += 1
+
+    table = Table(title=f"Startup imports: rca.cli {' '.join(argv)}")
+    table.add_column("Package", style="cyan")
+    table.add_column("Modules", justify="right")
+    table.add_column("Time (ms)", justify="right", style="bold")
+    ranked = sorted(by_package.items(), key=lambda item: item[1]['self_us'], reverse=True)
+    for name, entry in ranked[:limit]:
+        table.add_row(name, str(entry['count']), f"{entry['self_us'] / 1000:.1f}")
+    console.print(table)
+    console.print(f"Imports: {report['import_seconds'] * 1000:.0f} ms "
+                  f"({len(report['modules'])} modules), process total: {elapsed * 1000:.0f} ms")
+    return report['returncode']
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser (shared by main and the worker daemon)."""
     parser = argparse.ArgumentParser(description="RCA Agent - Root Cause Analysis Automation")
+    parser.add_argument('--startup-report', action='store_true',
+                        help='Run the command and report per-module import time')
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Init command
@@ -326,6 +468,12 @@ def main():
     parser_triage.add_argument('incident_file', help='Path to incident JSON file')
     parser_triage.set_defaults(func=cmd_triage)
     
+    # Batch triage command
+    parser_batch = subparsers.add_parser('triage-batch', help='Triage all incidents in a directory (NDJSON output)')
+    parser_batch.add_argument('incidents_dir', help='Directory of incident JSON files')
+    parser_batch.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser_batch.set_defaults(func=cmd_triage_batch)
+    
     # RCA command
     parser_rca = subparsers.add_parser('rca', help='Generate RCA document')
     parser_rca.add_argument('incident_file', help='Path to incident JSON file')
@@ -353,15 +501,46 @@ def main():
     # Compare command
     parser_compare = subparsers.add_parser('compare', help='Generate comparison document')
     parser_compare.add_argument('incident_file', help='Path to incident JSON file')
+    parser_compare.add_argument('--fix-commit', help='Fix commit hash to compare against')
+    parser_compare.add_argument('--context', type=int, help='Unchanged lines shown around each diff hunk (default: 3)')
     parser_compare.set_defaults(func=cmd_compare)
     
+    # Export bundle command
+    parser_bundle = subparsers.add_parser('export-bundle', help='Export incidents\' artifacts as one zip/tar archive')
+    parser_bundle.add_argument('incidents', nargs='+', help='Incident IDs (or incident JSON files)')
+    parser_bundle.add_argument('--format', choices=['zip', 'tar', 'tgz'], default='zip', help='Archive format')
+    parser_bundle.add_argument('-o', '--output', help='Archive path, or - for stdout (default: rca-bundle-<incident>.<ext>)')
+    parser_bundle.set_defaults(func=cmd_export_bundle)
+    
+    # Index logs command
+    parser_index = subparsers.add_parser('index-logs', help='Build or update the persistent log index')
+    parser_index.add_argument('log_files', nargs='*', default=['data/logs_mock.csv'],
+                              help='Log CSV files to index (default: data/logs_mock.csv)')
+    parser_index.add_argument('--index', help='Path to the index database')
+    parser_index.set_defaults(func=cmd_index_logs)
+    
     # Demo command
     parser_demo = subparsers.add_parser('demo', help='Run complete demo workflow')
     parser_demo.add_argument('incident_file', help='Path to incident JSON file')
     parser_demo.set_defaults(func=cmd_demo)
     
+    # Worker command
+    parser_worker = subparsers.add_parser('worker', help='Serve pipeline jobs over a Unix socket')
+    parser_worker.add_argument('--socket', help='Socket path (default: $RCA_WORKER_SOCKET or .rca_cache/worker.sock)')
+    parser_worker.set_defaults(func=cmd_worker)
+    
+    return parser
+
+
+def main():
+    """Main CLI entry point."""
+    parser = build_parser()
     args = parser.parse_args()
     
+    if args.startup_report:
+        argv = [a for a in sys.argv[1:] if a != '--startup-report']
+        sys.exit(cmd_startup_report(argv))
+    
     if not args.command:
         parser.print_help()
         return
@@ -1,19 +1,40 @@
-"""Show Before/After code and timeline delta."""
-import os
-from jinja2 import Environment, FileSystemLoader
+"""Show Before/After code, its diff and the timeline delta."""
+from .diffing import DEFAULT_CONTEXT, FileDiff
+from .gitutils import FIXED_FILES, get_fix_base, get_git_reader
 from .schema import ComparisonData
 from .loaders import load_repo_file, get_file_extension
+from .templating import render_to_file
+
+# Longer files are shown as their changed hunks only, not in full
+FULL_FILE_MAX_LINES = 200
 
 
 def generate_comparison_doc(incident_id: str, suspect_repo: str, suspect_file: str, 
-                          fix_commit: str, output_dir: str = "out") -> dict:
-    """Generate before/after comparison document."""
+                          fix_commit: str, output_dir: str = "out",
+                          context: int = DEFAULT_CONTEXT) -> dict:
+    """Generate before/after comparison document.
+
+    `context` is the number of unchanged lines shown around each hunk.
+    """
     
-    # Load the current (buggy) code
-    before_code = load_repo_file(suspect_repo, suspect_file) or "Code not found"
+    # Read both versions from the fix commit and the commit its fix branch
+    # started from (the parent, for a commit made outside apply_fix)
+    reader = get_git_reader()
+    repo_file = f"repos/{suspect_repo}/{suspect_file}"
+    fix_oid = reader.resolve(f"{fix_commit}^{{commit}}")
+    base = get_fix_base(incident_id) or reader.resolve(f"{fix_commit}^^{{commit}}")
+    after_code = reader.read_blob(fix_oid, repo_file) if fix_oid and fix_oid != base else None
+    if after_code is not None:
+        # A file the fix created has no "before"
+        before_code = (reader.read_blob(base, repo_file) if base else None) or ""
+    else:
+        # No fix commit (or the fix was a no-op): compare the working tree
+        # with the fix apply_fix would commit
+        before_code = load_repo_file(suspect_repo, suspect_file) or ""
+        after_code = FIXED_FILES.get(repo_file, before_code)
     
-    # Generate the fixed code (simplified - in real implementation, we'd get from git)
-    after_code = generate_fixed_code(before_code, suspect_file)
+    diff = FileDiff(before_code, after_code, context)
+    show_full = max(len(diff.before_lines), len(diff.after_lines)) <= FULL_FILE_MAX_LINES
     
     # Determine language for syntax highlighting
     lang = get_file_extension(suspect_file)
@@ -29,78 +50,31 @@ def generate_comparison_doc(incident_id: str, suspect_repo: str, suspect_file: s
         timeline_delta="Fixed in commit " + fix_commit[:8]
     )
     
-    # Render template
-    env = Environment(
-        loader=FileSystemLoader('docs/templates'),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
-    
-    template = env.get_template('comparison.md.j2')
-    content = template.render(
+    # Stream the rendered template to file
+    output_path = f"{output_dir}/{incident_id}_comparison.md"
+    render_to_file(
+        'comparison.md.j2',
+        output_path,
         incident_id=comparison_data.incident_id,
+        file_path=repo_file,
         before_code=comparison_data.before_code,
         after_code=comparison_data.after_code,
         before_lang=comparison_data.before_lang,
         after_lang=comparison_data.after_lang,
+        diff=diff,
+        show_full=show_full,
         delta_note=comparison_data.delta_note,
         timeline_delta=comparison_data.timeline_delta
     )
     
-    # Save to file
-    output_path = f"{output_dir}/{incident_id}_comparison.md"
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write(content)
-    
     return {
         'path': output_path,
-        'content': content,
-        'data': comparison_data
+        'data': comparison_data,
+        'lines_added': diff.added,
+        'lines_removed': diff.removed
     }
 
 
-def generate_fixed_code(original_code: str, file_path: str) -> str:
-    """Generate fixed version of the code."""
-    
-    if file_path.endswith('.ts'):
-        # Fix TypeScript checkout timeout issue
-        if "fakePaymentCall(6000)" in original_code:
-            fixed_code = original_code.replace(
-                "await fakePaymentCall(6000); // simulate a slow gateway (6s)",
-                """try {
-    await Promise.race([
-      fakePaymentCall(6000),
-      new Promise((_, reject) => 
-        setTimeout(() => reject(new CheckoutTimeoutError('5s timeout')), 5000)
-      )
-    ]);
-  } catch (error) {
-    if (error instanceof CheckoutTimeoutError) {
-      // Retry once with shorter timeout
-      await fakePaymentCall(3000);
-    } else {
-      throw error;
-    }
-  }"""
-            )
-            return fixed_code
-    
-    elif file_path.endswith('.py'):
-        # Fix Python refund limits issue
-        if "limits.LIMITS[user_tier]" in original_code:
-            fixed_code = original_code.replace(
-                "bucket = limits.LIMITS[user_tier]  # KeyError if 'premium' missing",
-                """bucket = limits.LIMITS.get(user_tier)
-    if not bucket:
-        raise RefundLimitExceededError(f'Unknown tier: {user_tier}')"""
-            )
-            return fixed_code
-    
-    # If no specific fix pattern found, return original with comment
-    return original_code + "\n\n# TODO: Apply appropriate fixes based on RCA analysis"
-
-
 def generate_delta_note(file_path: str) -> str:
     """Generate a note explaining the key change."""
     
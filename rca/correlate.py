@@ -1,26 +1,24 @@
 """Use data maps to collect candidate repos/files and attach reasons."""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from .schema import Incident, Candidate
-from .loaders import (
-    load_services, load_routes, load_jobs, load_error_index, 
-    load_releases, load_logs
-)
+from .loaders import build_previous_releases, get_knowledge_base
+from .signatures import build_signature_matcher
+from .gitutils import get_release_changed_files
+from .spans import get_span_index
 
 
 def correlate_incident(incident: Incident) -> List[Candidate]:
     """Find candidate files for the incident using data maps."""
     candidates = {}  # repo/file -> candidate
     
-    # Load all data maps
-    services = load_services()
-    routes = load_routes()
-    jobs = load_jobs()
-    error_index = load_error_index()
-    releases = load_releases()
-    logs = load_logs()
+    # Data maps come from the shared knowledge base (reloaded only on change)
+    kb = get_knowledge_base()
+    services = kb.services
+    routes = kb.routes
     
     # Helper to add or update candidate
-    def add_candidate(repo: str, file: str, score: int, reason: str):
+    def add_candidate(repo: str, file: str, score: int, reason: str,
+                      function: Optional[str] = None, line: Optional[int] = None):
         key = f"{repo}/{file}"
         if key not in candidates:
             candidates[key] = Candidate(
@@ -29,8 +27,23 @@ def correlate_incident(incident: Incident) -> List[Candidate]:
                 score=0,
                 reasons=[]
             )
-        candidates[key].score += score
-        candidates[key].reasons.append(reason)
+        candidate = candidates[key]
+        candidate.score += score
+        candidate.reasons.append(reason)
+        
+        # Pin the suspect function from the first handler name or log frame
+        if candidate.function is None and (function or line):
+            span_index = get_span_index(repo)
+            if function:
+                span = span_index.find(file, function)
+            else:
+                span = span_index.enclosing(file, line)
+            if span:
+                candidate.function = span.name
+                candidate.line_start = span.line_start
+                candidate.line_end = span.line_end
+            elif function:
+                candidate.function = function
     
     # 1. Service mapping (+1 base score)
     if incident.service in services:
@@ -47,51 +60,74 @@ def correlate_incident(incident: Incident) -> List[Candidate]:
             if '#' in handler:
                 file_path, function = handler.split('#')
                 repo = services.get(incident.service, {}).get('repo', 'unknown')
-                add_candidate(repo, file_path, 3, f"Endpoint {incident.api_endpoint} maps to {file_path}")
+                add_candidate(repo, file_path, 3, f"Endpoint {incident.api_endpoint} maps to {file_path}",
+                              function=function)
     
     # 3. Job/workflow mapping (+2 points)
     if incident.job_id:
-        for job in jobs:
-            if job['job_id'] == incident.job_id:
-                repo = job['repo']
-                handler = job['handler']
-                if '#' in handler:
-                    file_path, function = handler.split('#')
-                else:
-                    file_path = handler
-                add_candidate(repo, file_path, 2, f"Job {incident.job_id} maps to {file_path}")
+        jobs = kb.lookup('jobs', 'job_id', incident.job_id)
+        job_label = f"Job {incident.job_id}"
+    elif incident.workflow_id:
+        jobs = kb.lookup('jobs', 'workflow_id', incident.workflow_id)
+        job_label = f"Workflow {incident.workflow_id}"
+    else:
+        jobs = []
+    for job in jobs:
+        repo = job['repo']
+        handler = job['handler']
+        if '#' in handler:
+            file_path, function = handler.split('#')
+        else:
+            file_path, function = handler, None
+        add_candidate(repo, file_path, 2, f"{job_label} maps to {file_path}", function=function)
     
     # 4. Error signature mapping (+2 points)
     if incident.error_message:
-        for error in error_index:
-            if error['signature'] in incident.error_message:
-                repo = error['repo']
-                file_path = error['path_hint']
-                add_candidate(repo, file_path, 2, f"Error signature '{error['signature']}' maps to {file_path}")
+        matcher = kb.derive('error_index', build_signature_matcher)
+        for error in matcher.match_rows(incident.error_message):
+            repo = error['repo']
+            file_path = error['path_hint']
+            add_candidate(repo, file_path, 2, f"Error signature '{error['signature']}' maps to {file_path}")
     
     # 5. Logs mention (+1 point)
     if incident.request_id:
-        for log in logs:
-            if log['request_id'] == incident.request_id:
-                message = log['message']
-                # Extract file path from log message
-                if ' at ' in message:
-                    parts = message.split(' at ')
-                    if len(parts) > 1:
-                        file_info = parts[1]
-                        if ':' in file_info:
-                            file_path = file_info.split(':')[0]
-                            # Try to determine repo from service
-                            repo = services.get(incident.service, {}).get('repo', 'unknown')
-                            add_candidate(repo, file_path, 1, f"Request {incident.request_id} mentioned in logs at {file_path}")
+        logs = kb.log_source.scan(request_id=incident.request_id)
+        log_label = f"Request {incident.request_id}"
+    elif incident.session_id:
+        logs = kb.log_source.scan(session_id=incident.session_id)
+        log_label = f"Session {incident.session_id}"
+    else:
+        logs = []
+    for log in logs:
+        message = log['message']
+        # Extract file path from log message
+        if ' at ' in message:
+            parts = message.split(' at ')
+            if len(parts) > 1:
+                file_info = parts[1]
+                if ':' in file_info:
+                    file_path, _, line_info = file_info.partition(':')
+                    line_digits = line_info[:len(line_info) - len(line_info.lstrip('0123456789'))]
+                    # Try to determine repo from service
+                    repo = services.get(incident.service, {}).get('repo', 'unknown')
+                    add_candidate(repo, file_path, 1, f"{log_label} mentioned in logs at {file_path}",
+                                  line=int(line_digits) if line_digits else None)
     
     # 6. Release changes (+1 point)
     if incident.version and incident.service:
-        for release in releases:
-            if release['service'] == incident.service and release['release_tag'] == incident.version:
-                # This is a placeholder - in real implementation, we'd parse git commits
-                repo = services.get(incident.service, {}).get('repo', 'unknown')
+        repo = services.get(incident.service, {}).get('repo', 'unknown')
+        previous_releases = kb.derive('releases', build_previous_releases)
+        for release in kb.lookup('releases', ('service', 'release_tag'), (incident.service, incident.version)):
+            previous = previous_releases.get(id(release))
+            changed_files = get_release_changed_files(release, previous)
+            if changed_files is None:
+                # No git history for this release; fall back to a release-level signal
                 add_candidate(repo, "changed_in_release", 1, f"Changed in release {incident.version}")
+                continue
+            prefix = f"repos/{repo}/"
+            for path in changed_files:
+                if path.startswith(prefix):
+                    add_candidate(repo, path[len(prefix):], 1, f"Changed in release {incident.version}")
     
     # Convert to list and sort by score
     candidate_list = list(candidates.values())
@@ -102,12 +138,16 @@ def correlate_incident(incident: Incident) -> List[Candidate]:
 
 def get_top_candidate(incident: Incident) -> Candidate:
     """Get the highest-scoring candidate."""
-    candidates = correlate_incident(incident)
+    return select_top_candidate(incident, correlate_incident(incident))
+
+
+def select_top_candidate(incident: Incident, candidates: List[Candidate]) -> Candidate:
+    """Pick the highest-scoring candidate from an already ranked list."""
     if candidates:
         return candidates[0]
     
     # Fallback candidate
-    services = load_services()
+    services = get_knowledge_base().services
     service_info = services.get(incident.service, {'repo': 'unknown', 'owners': 'unknown'})
     return Candidate(
         repo=service_info['repo'],
@@ -0,0 +1,161 @@
+"""Run pipeline steps as a dependency graph, overlapping independent steps."""
+import importlib
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class Node:
+    """One pipeline step.
+
+    ``func`` is called as ``func(*args(results))`` where ``results`` maps
+    finished node names to their return values. ``kind`` selects where it
+    runs: "thread" for I/O-bound work (git, Linear, file writes) or
+    "process" for CPU-bound work such as PDF rendering; process nodes need
+    a picklable, module-level ``func`` and picklable arguments.
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], deps: Iterable[str] = (),
+                 kind: str = "thread", args: Optional[Callable[[Dict[str, Any]], Tuple]] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown node kind: {kind}")
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.kind = kind
+        self.args = args or (lambda results: ())
+
+
+def _import_modules(modules: Tuple[str, ...]) -> None:
+    # Warm-up task: pays a spawned worker's start-up and import cost early
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _check_graph(nodes: List[Node]) -> None:
+    """Raise ValueError on unknown dependencies or cycles."""
+    names = {node.name for node in nodes}
+    for node in nodes:
+        missing = [dep for dep in node.deps if dep not in names]
+        if missing:
+            raise ValueError(f"Node {node.name} depends on unknown nodes: {missing}")
+
+    visiting, done = set(), set()
+    by_name = {node.name: node for node in nodes}
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through {name}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for node in nodes:
+        visit(node.name)
+
+
+def run_dag(nodes: List[Node], max_threads: int = 4, max_processes: int = 2,
+            on_event: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+            executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """Run nodes as soon as their dependencies finish.
+
+    ``on_event(event, name, payload)`` is called from the calling thread for
+    "start", "finish", "error" and "skip" events. A failed node's
+    dependents are skipped; independent branches keep running.
+
+    Process nodes run on ``executor`` when one is given (it is left
+    running for the caller); otherwise a spawn pool of ``max_processes``
+    workers is created for this run and shut down afterwards.
+
+    Returns ``{'results', 'errors', 'skipped', 'timings', 'wall_time'}``
+    where timings hold per-node start offset and duration in seconds.
+    """
+    _check_graph(nodes)
+    emit = on_event or (lambda event, name, payload: None)
+    pending = {node.name: node for node in nodes}
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    skipped: List[str] = []
+    timings: Dict[str, Dict[str, Any]] = {}
+    running: Dict[Future, Tuple[Node, float]] = {}
+
+    threads = ThreadPoolExecutor(max_workers=max_threads)
+    processes = executor
+    owns_processes = False
+    process_modules = tuple(sorted({node.func.__module__ for node in nodes if node.kind == "process"}))
+    if processes is None and process_modules:
+        processes = ProcessPoolExecutor(max_workers=max_processes,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        owns_processes = True
+        # Workers only start on submit, so start them now, importing the
+        # process nodes' modules while the early nodes run
+        for _ in range(max_processes):
+            processes.submit(_import_modules, process_modules)
+    started = time.perf_counter()
+
+    def _run_in_thread(node, args):
+        return node.func(*args)
+
+    try:
+        while pending or running:
+            # Skip nodes whose dependencies failed or were skipped
+            for name, node in list(pending.items()):
+                if any(dep in errors or dep in skipped for dep in node.deps):
+                    del pending[name]
+                    skipped.append(name)
+                    emit("skip", name, {})
+
+            # Submit every node whose dependencies are done
+            for name, node in list(pending.items()):
+                if all(dep in results for dep in node.deps):
+                    del pending[name]
+                    node_started = time.perf_counter()
+                    emit("start", name, {"kind": node.kind})
+                    try:
+                        args = node.args(results)
+                        if node.kind == "process":
+                            future = processes.submit(node.func, *args)
+                        else:
+                            future = threads.submit(_run_in_thread, node, args)
+                    except Exception as e:
+                        errors[name] = str(e)
+                        emit("error", name, {"error": str(e)})
+                        continue
+                    running[future] = (node, node_started)
+
+            if not running:
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                node, node_started = running.pop(future)
+                finished = time.perf_counter()
+                timings[node.name] = {
+                    "kind": node.kind,
+                    "start": node_started - started,
+                    "duration": finished - node_started,
+                }
+                try:
+                    results[node.name] = future.result()
+                except Exception as e:
+                    errors[node.name] = str(e)
+                    emit("error", node.name, {"error": str(e), **timings[node.name]})
+                else:
+                    emit("finish", node.name, {"result": results[node.name], **timings[node.name]})
+    finally:
+        threads.shutdown(wait=True)
+        if owns_processes:
+            processes.shutdown(wait=True)
+
+    return {
+        "results": results,
+        "errors": errors,
+        "skipped": skipped,
+        "timings": timings,
+        "wall_time": time.perf_counter() - started,
+    }
@@ -0,0 +1,352 @@
+"""Line diffs in linear space (Myers' algorithm) as unified and side-by-side hunks."""
+from collections import Counter
+from math import isqrt
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Unchanged lines shown around each change
+DEFAULT_CONTEXT = 3
+# Once a split has taken this many edit steps (or sqrt of the input size,
+# if larger) it settles for the furthest-reaching path found so far, as
+# git's xdiff does. Bounds the cost on very different files; the result
+# may then be slightly longer than minimal.
+MIN_COST_LIMIT = 256
+# A line matching more than sqrt(N) lines on the other side (clamped to
+# these bounds) is dropped from the search too when it sits among
+# unmatched lines, like the braces and blank lines left over in a
+# rewritten block. The floor keeps small files diffed exactly.
+MIN_MATCH_LIMIT = 64
+MAX_MATCH_LIMIT = 1024
+# How far around such a line to look, and the share of it that must be
+# unmatched (1 in KEEP_RUN_RATIO) for the line to be dropped
+SIMILAR_SCAN_WINDOW = 100
+KEEP_RUN_RATIO = 4
+# Characters of each side shown per side-by-side row
+SIDE_BY_SIDE_WIDTH = 42
+
+# (tag, i1, i2, j1, j2) as in difflib: tag is equal, replace, delete or insert
+Opcode = Tuple[str, int, int, int, int]
+
+_NO_PATH = 1 << 62
+
+
+def _split(a: List[int], alo: int, ahi: int, b: List[int], blo: int, bhi: int,
+           kvdf: List[int], kvdb: List[int], off: int, cost_limit: int) -> Tuple[int, int]:
+    """Point (i, j) on an optimal path through a[alo:ahi] x b[blo:bhi].
+
+    Runs the forward and backward searches until they overlap (the
+    "middle snake"). Diagonal k = i - j is stored at kvdf/kvdb[k + off],
+    so both vectors are shared by every split of one comparison.
+    """
+    dmin, dmax = alo - bhi, ahi - blo
+    fmid, bmid = alo - blo, ahi - bhi
+    odd = (fmid - bmid) & 1
+    fmin = fmax = fmid
+    bmin = bmax = bmid
+    kvdf[fmid + off] = alo
+    kvdb[bmid + off] = ahi
+    cost = 0
+    while True:
+        cost += 1
+        if fmin > dmin:
+            fmin -= 1
+            kvdf[fmin - 1 + off] = -1
+        else:
+            fmin += 1
+        if fmax < dmax:
+            fmax += 1
+            kvdf[fmax + 1 + off] = -1
+        else:
+            fmax -= 1
+        for d in range(fmax, fmin - 1, -2):
+            k = d + off
+            if kvdf[k - 1] >= kvdf[k + 1]:
+                i = kvdf[k - 1] + 1
+            else:
+                i = kvdf[k + 1]
+            j = i - d
+            while i < ahi and j < bhi and a[i] == b[j]:
+                i += 1
+                j += 1
+            kvdf[k] = i
+            if odd and bmin <= d <= bmax and kvdb[k] <= i:
+                return i, j
+
+        if bmin > dmin:
+            bmin -= 1
+            kvdb[bmin - 1 + off] = _NO_PATH
+        else:
+            bmin += 1
+        if bmax < dmax:
+            bmax += 1
+            kvdb[bmax + 1 + off] = _NO_PATH
+        else:
+            bmax -= 1
+        for d in range(bmax, bmin - 1, -2):
+            k = d + off
+            if kvdb[k - 1] < kvdb[k + 1]:
+                i = kvdb[k - 1]
+            else:
+                i = kvdb[k + 1] - 1
+            j = i - d
+            while i > alo and j > blo and a[i - 1] == b[j - 1]:
+                i -= 1
+                j -= 1
+            kvdb[k] = i
+            if not odd and fmin <= d <= fmax and i <= kvdf[k]:
+                return i, j
+
+        if cost >= cost_limit:
+            # Too expensive: split at whichever search got furthest
+            fbest, fbest_i = -1, -1
+            for d in range(fmax, fmin - 1, -2):
+                i = min(kvdf[d + off], ahi)
+                j = i - d
+                if j > bhi:
+                    i, j = bhi + d, bhi
+                if i + j > fbest:
+                    fbest, fbest_i = i + j, i
+            bbest, bbest_i = _NO_PATH, _NO_PATH
+            for d in range(bmax, bmin - 1, -2):
+                i = max(alo, kvdb[d + off])
+                j = i - d
+                if j < blo:
+                    i, j = blo + d, blo
+                if i + j < bbest:
+                    bbest, bbest_i = i + j, i
+            if (ahi + bhi) - bbest < fbest - (alo + blo):
+                return fbest_i, fbest - fbest_i
+            return bbest_i, bbest - bbest_i
+
+
+def _mark_changes(a: List[int], b: List[int], a_changed: List[bool], b_changed: List[bool]) -> None:
+    """Flag the lines of a and b that are not on a shortest edit path."""
+    n, m = len(a), len(b)
+    off = m + 1
+    kvdf = [0] * (n + m + 3)
+    kvdb = [0] * (n + m + 3)
+    cost_limit = max(MIN_COST_LIMIT, isqrt(n + m + 3))
+    # Explicit stack instead of recursion; each split halves the work
+    stack = [(0, n, 0, m)]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if alo == ahi:
+            b_changed[blo:bhi] = [True] * (bhi - blo)
+        elif blo == bhi:
+            a_changed[alo:ahi] = [True] * (ahi - alo)
+        else:
+            i, j = _split(a, alo, ahi, b, blo, bhi, kvdf, kvdb, off, cost_limit)
+            stack.append((i, ahi, j, bhi))
+            stack.append((alo, i, blo, j))
+
+
+# Per-line classification before the search
+_UNMATCHED, _MATCHED, _MULTIMATCH = 0, 1, 2
+
+
+def _changed_before_search(ids: List[int], other_counts: Counter) -> List[bool]:
+    """Lines that are changes whatever the search finds (see diff_opcodes).
+
+    A very common line is dropped when, within SIMILAR_SCAN_WINDOW lines
+    on each side, the unbroken run of unmatched/common lines around it
+    has unmatched lines on both sides and at most 1 in KEEP_RUN_RATIO
+    common lines. Runs and prefix counts keep this linear.
+    """
+    limit = min(MAX_MATCH_LIMIT, max(MIN_MATCH_LIMIT, isqrt(len(ids))))
+    kinds = []
+    for line in ids:
+        matches = other_counts.get(line, 0)
+        kinds.append(_UNMATCHED if not matches else _MULTIMATCH if matches >= limit else _MATCHED)
+
+    n = len(kinds)
+    # unmatched_before[i]: unmatched lines in kinds[:i]
+    unmatched_before = [0] * (n + 1)
+    for i, kind in enumerate(kinds):
+        unmatched_before[i + 1] = unmatched_before[i] + (kind == _UNMATCHED)
+    changed = [kind == _UNMATCHED for kind in kinds]
+    run_start, run_end = 0, -1
+    for i, kind in enumerate(kinds):
+        if kind == _MATCHED:
+            run_start = i + 1
+            continue
+        if kind != _MULTIMATCH:
+            continue
+        if run_end < i:
+            run_end = i
+            while run_end + 1 < n and kinds[run_end + 1] != _MATCHED:
+                run_end += 1
+        lo = max(run_start, i - SIMILAR_SCAN_WINDOW)
+        hi = min(run_end, i + SIMILAR_SCAN_WINDOW)
+        before = unmatched_before[i] - unmatched_before[lo]
+        after = unmatched_before[hi + 1] - unmatched_before[i + 1]
+        if before and after:
+            multimatch = (hi - lo + 1) - before - after
+            changed[i] = multimatch * KEEP_RUN_RATIO < multimatch + before + after
+    return changed
+
+
+def diff_opcodes(a: Sequence[str], b: Sequence[str]) -> List[Opcode]:
+    """difflib-style opcodes turning lines a into lines b.
+
+    Lines are interned to ints first. As in git's xdiff, lines that occur
+    on only one side, and very common lines surrounded by those, are
+    marked changed up front and left out of the search, which keeps
+    rewritten regions cheap; the rest goes through Myers' O((N+M)D)
+    algorithm in linear space.
+    """
+    ids: dict = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    a_changed = _changed_before_search(a_ids, Counter(b_ids))
+    b_changed = _changed_before_search(b_ids, Counter(a_ids))
+
+    a_kept = [i for i, changed in enumerate(a_changed) if not changed]
+    b_kept = [j for j, changed in enumerate(b_changed) if not changed]
+    a_kept_changed = [False] * len(a_kept)
+    b_kept_changed = [False] * len(b_kept)
+    _mark_changes([a_ids[i] for i in a_kept], [b_ids[j] for j in b_kept],
+                  a_kept_changed, b_kept_changed)
+    for i, changed in zip(a_kept, a_kept_changed):
+        a_changed[i] = changed
+    for j, changed in zip(b_kept, b_kept_changed):
+        b_changed[j] = changed
+
+    # Unchanged lines pair up in order; runs of changes between them become opcodes
+    opcodes = []
+    i = j = 0
+    n, m = len(a), len(b)
+    while i < n or j < m:
+        i0, j0 = i, j
+        while i < n and j < m and not a_changed[i] and not b_changed[j]:
+            i += 1
+            j += 1
+        if i > i0:
+            opcodes.append(('equal', i0, i, j0, j))
+        i0, j0 = i, j
+        while i < n and a_changed[i]:
+            i += 1
+        while j < m and b_changed[j]:
+            j += 1
+        if i > i0 or j > j0:
+            tag = 'replace' if i > i0 and j > j0 else ('delete' if i > i0 else 'insert')
+            opcodes.append((tag, i0, i, j0, j))
+    return opcodes
+
+
+def grouped_opcodes(opcodes: List[Opcode], context: int = DEFAULT_CONTEXT) -> Iterator[List[Opcode]]:
+    """Split opcodes into hunks with up to `context` unchanged lines around each change."""
+    if all(tag == 'equal' for tag, *_ in opcodes):
+        return
+    codes = list(opcodes)
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # An unchanged run longer than both contexts ends the hunk
+        if tag == 'equal' and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+
+def _unified_range(start: int, stop: int) -> str:
+    # Same convention as diff -u / difflib
+    length = stop - start
+    if length == 1:
+        return f'{start + 1}'
+    return f'{start + 1 if length else start},{length}'
+
+
+def _cell(number: Optional[int], text: str, width: int) -> str:
+    text = text.expandtabs(4)
+    if len(text) > width:
+        text = text[:width - 1] + '…'
+    return f"{'' if number is None else number:>5} {text:<{width}}"
+
+
+class Hunk:
+    """One group of changes with its context lines."""
+
+    def __init__(self, a: Sequence[str], b: Sequence[str], opcodes: List[Opcode]):
+        self.a = a
+        self.b = b
+        self.opcodes = opcodes
+        self.old_start, self.old_stop = opcodes[0][1], opcodes[-1][2]
+        self.new_start, self.new_stop = opcodes[0][3], opcodes[-1][4]
+
+    @property
+    def header(self) -> str:
+        return (f'@@ -{_unified_range(self.old_start, self.old_stop)} '
+                f'+{_unified_range(self.new_start, self.new_stop)} @@')
+
+    def unified(self) -> List[str]:
+        """Header plus ' ', '-' and '+' prefixed lines."""
+        lines = [self.header]
+        for tag, i1, i2, j1, j2 in self.opcodes:
+            if tag == 'equal':
+                lines.extend(' ' + line for line in self.a[i1:i2])
+                continue
+            lines.extend('-' + line for line in self.a[i1:i2])
+            lines.extend('+' + line for line in self.b[j1:j2])
+        return lines
+
+    def side_by_side(self, width: int = SIDE_BY_SIDE_WIDTH) -> List[str]:
+        """Header plus rows of 'old line | new line' with line numbers.
+
+        The marker column is blank for context, '|' for a changed pair,
+        '<' for a removed line and '>' for an added one.
+        """
+        rows = [self.header]
+        for tag, i1, i2, j1, j2 in self.opcodes:
+            for offset in range(max(i2 - i1, j2 - j1)):
+                i, j = i1 + offset, j1 + offset
+                left = _cell(i + 1, self.a[i], width) if i < i2 else _cell(None, '', width)
+                right = _cell(j + 1, self.b[j], width) if j < j2 else ''
+                if tag == 'equal':
+                    marker = ' '
+                elif i < i2 and j < j2:
+                    marker = '|'
+                else:
+                    marker = '<' if i < i2 else '>'
+                rows.append(f'{left} {marker} {right}'.rstrip())
+        return rows
+
+
+class FileDiff:
+    """Diff of two versions of a text, grouped into hunks.
+
+    ``added``/``removed`` count changed lines; ``hunks`` is empty when the
+    texts have the same lines.
+    """
+
+    def __init__(self, before: str, after: str, context: int = DEFAULT_CONTEXT):
+        self.before_lines = before.splitlines()
+        self.after_lines = after.splitlines()
+        self.opcodes = diff_opcodes(self.before_lines, self.after_lines)
+        self.hunks = [Hunk(self.before_lines, self.after_lines, group)
+                      for group in grouped_opcodes(self.opcodes, context)]
+        self.removed = sum(i2 - i1 for tag, i1, i2, _, _ in self.opcodes if tag != 'equal')
+        self.added = sum(j2 - j1 for tag, _, _, j1, j2 in self.opcodes if tag != 'equal')
+
+    def unified(self, from_file: str = 'a', to_file: str = 'b') -> str:
+        """The whole diff in unified format ('' if nothing changed)."""
+        if not self.hunks:
+            return ''
+        lines = [f'--- {from_file}', f'+++ {to_file}']
+        for hunk in self.hunks:
+            lines.extend(hunk.unified())
+        return '\n'.join(lines)
@@ -0,0 +1,252 @@
+"""In-memory directory listings kept current with inotify or polling."""
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0
+# Temporaries of atomic writes (<name>.<pid>[.<thread>].tmp) are never listed
+IGNORED_SUFFIXES = ('.tmp',)
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class _Inotify:
+    """Non-blocking inotify descriptor; events are drained on demand."""
+
+    _libc = None
+
+    def __init__(self):
+        libc = self._load_libc()
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    @classmethod
+    def _load_libc(cls):
+        if cls._libc is None:
+            if not sys.platform.startswith('linux'):
+                raise OSError("inotify is only available on Linux")
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            cls._libc = libc
+        return cls._libc
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read_events(self) -> List[tuple]:
+        """Return pending (wd, mask, name) events without blocking."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                events.append((wd, mask, os.fsdecode(name)))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryIndex:
+    """Listing of the files in one directory, updated incrementally.
+
+    On Linux an inotify watch reports changed names; each access drains the
+    pending events (one non-blocking read when nothing changed) and
+    re-stats/re-parses only those files. Elsewhere, or with
+    RCA_DIRINDEX_POLL=1, the directory is rescanned at most every
+    poll_interval seconds, re-parsing only files whose mtime or size
+    changed. ``version`` increases on every change, for ETags.
+
+    ``parse(path)`` turns a file into its listing data; files it rejects
+    (raises) are left out until they change again. ``group_key(name)``
+    builds a secondary index for ``group()`` lookups.
+    """
+
+    def __init__(self, directory: Union[str, Path], pattern: str = '*',
+                 parse: Optional[Callable[[Path], Any]] = None,
+                 group_key: Optional[Callable[[str], str]] = None,
+                 poll_interval: float = POLL_INTERVAL):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.parse = parse
+        self.group_key = group_key
+        self.poll_interval = poll_interval
+        self.version = 0
+
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._stamps: Dict[str, tuple] = {}
+        self._groups: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._sorted: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self._last_scan: Optional[float] = None
+        self._wd: Optional[int] = None
+        self._inotify: Optional[_Inotify] = None
+        if os.getenv('RCA_DIRINDEX_POLL') != '1':
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify unavailable for {self.directory}, polling instead: {e}")
+
+    @property
+    def mode(self) -> str:
+        return 'inotify' if self._inotify is not None else 'poll'
+
+    def _matches(self, name: str) -> bool:
+        return fnmatch.fnmatch(name, self.pattern) and not name.endswith(IGNORED_SUFFIXES)
+
+    def _remove(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        self._stamps.pop(name, None)
+        if entry is not None:
+            if self.group_key:
+                group = self._groups.get(self.group_key(name))
+                if group is not None:
+                    group.pop(name, None)
+            self.version += 1
+            self._sorted = None
+
+    def _update(self, name: str, st: Optional[os.stat_result] = None) -> None:
+        path = self.directory / name
+        if st is None:
+            try:
+                st = path.stat()
+            except OSError:
+                self._remove(name)
+                return
+        if not path.is_file():
+            self._remove(name)
+            return
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._stamps.get(name) == stamp:
+            return
+        self._stamps[name] = stamp
+
+        entry = {'name': name, 'size': st.st_size, 'modified': st.st_mtime, 'type': path.suffix}
+        if self.parse is not None:
+            try:
+                entry['data'] = self.parse(path)
+            except Exception as e:
+                logger.warning(f"Failed to parse {path}: {e}")
+                self._remove(name)
+                # Keep the stamp so the file is retried only once it changes
+                self._stamps[name] = stamp
+                return
+        self._entries[name] = entry
+        if self.group_key:
+            self._groups.setdefault(self.group_key(name), {})[name] = entry
+        self.version += 1
+        self._sorted = None
+
+    def _rescan(self) -> None:
+        seen = set()
+        try:
+            with os.scandir(self.directory) as it:
+                for dirent in it:
+                    if self._matches(dirent.name):
+                        seen.add(dirent.name)
+                        self._update(dirent.name, dirent.stat())
+        except FileNotFoundError:
+            pass
+        for name in set(self._stamps) - seen:
+            self._remove(name)
+            self._stamps.pop(name, None)
+        self._last_scan = time.monotonic()
+
+    def _sync(self) -> None:
+        if self._inotify is None:
+            if self._last_scan is None or time.monotonic() - self._last_scan >= self.poll_interval:
+                self._rescan()
+            return
+
+        if self._wd is None:
+            # Watch first, then scan, so no change falls between the two
+            if not self.directory.is_dir():
+                if self._stamps:
+                    self._rescan()
+                return
+            try:
+                self._wd = self._inotify.add_watch(str(self.directory))
+            except OSError as e:
+                logger.info(f"Cannot watch {self.directory}, polling instead: {e}")
+                self._inotify.close()
+                self._inotify = None
+                self._rescan()
+                return
+            self._rescan()
+            return
+
+        rescan = False
+        changed = set()
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                rescan = True
+            elif mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                # Directory removed or moved away; re-watch once it is back
+                self._wd = None
+                rescan = True
+            elif wd == self._wd and name and self._matches(name):
+                changed.add(name)
+        if rescan:
+            self._rescan()
+            return
+        for name in changed:
+            self._update(name)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """All indexed files, sorted by name."""
+        with self._lock:
+            self._sync()
+            if self._sorted is None:
+                self._sorted = [self._entries[name] for name in sorted(self._entries)]
+            return self._sorted
+
+    def group(self, key: str) -> List[Dict[str, Any]]:
+        """Files whose group_key equals key, sorted by name."""
+        with self._lock:
+            self._sync()
+            group = self._groups.get(key, {})
+            return [group[name] for name in sorted(group)]
+
+    def current_version(self) -> int:
+        """Version after applying any pending changes."""
+        with self._lock:
+            self._sync()
+            return self.version
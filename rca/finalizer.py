@@ -1,45 +1,25 @@
 """Helper to gather files changed and finalize RCA content."""
 import os
-import subprocess
+import threading
 from typing import List, Dict, Any
 from datetime import datetime
+from .gitutils import GitBatchError, get_git_reader
 
 
 def get_files_changed_in_commit(commit_hash: str, repo_path: str = ".") -> List[str]:
     """Get list of files changed in a specific commit."""
     try:
-        # Run git command to get changed files
-        result = subprocess.run(
-            ["git", "show", "--name-only", "--pretty=format:", commit_hash],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Filter out empty lines
-        files = [f.strip() for f in result.stdout.split('\n') if f.strip()]
-        return files
-    except subprocess.CalledProcessError:
-        # Fallback if git command fails
-        return ["src/orders/checkout.ts", "service/payment/limits.py"]
-    except FileNotFoundError:
-        # Git not available
+        return get_git_reader(repo_path).changed_files(commit_hash)
+    except GitBatchError:
+        # Fallback if the commit is unknown or git is unavailable
         return ["src/orders/checkout.ts", "service/payment/limits.py"]
 
 
 def get_commit_message(commit_hash: str, repo_path: str = ".") -> str:
     """Get commit message for a specific commit."""
     try:
-        result = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%s", commit_hash],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        return get_git_reader(repo_path).commit_info(commit_hash)['subject']
+    except GitBatchError:
         return "Fix timeout and error handling issues"
 
 
@@ -75,8 +55,15 @@ def update_incident_resolved_time(incident_path: str, resolved_time: str = None)
         
         incident_data['resolved_at'] = resolved_time
         
-        with open(incident_path, 'w') as f:
-            json.dump(incident_data, f, indent=2)
+        # Replace the file atomically so concurrent readers never see it half written
+        tmp_path = f"{incident_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(incident_data, f, indent=2)
+            os.replace(tmp_path, incident_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
     except Exception as e:
         print(f"Warning: Could not update incident file: {e}")
 
@@ -1,9 +1,16 @@
 """Create local git repo, baseline commit, bug commit, tag release, apply fix commit."""
+import atexit
+import fcntl
+import json
 import os
 import subprocess
 import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+from .loaders import CACHE_DIR
 
 
 def init_git_repo(repo_path: str = ".") -> bool:
@@ -92,13 +99,16 @@ def create_release_tag(tag_name: str, repo_path: str = ".") -> bool:
         return False
 
 
-def apply_fix_commit(repo_path: str = ".") -> str:
-    """Apply fixes and create fix commit."""
-    try:
-        # Apply fixes to checkout.ts
-        checkout_file = Path(repo_path) / "repos" / "repo-orders" / "src" / "orders" / "checkout.ts"
-        if checkout_file.exists():
-            fixed_checkout = """// Fixed: Added timeout guard and retry logic
+FIX_BRANCH_PREFIX = 'rca/fix/'
+# Commit each fix branch was created from, so fixes can be diffed against it
+FIX_BASE_REF_PREFIX = 'refs/rca/fix-base/'
+WORKTREE_DIR = f'{CACHE_DIR}/worktrees'
+REF_LOCK_FILE = 'git-refs.lock'
+FIX_COMMIT_MESSAGE = "Fix: Add timeout guard, retry logic, and safe dict access"
+
+# Fixed contents of the suspect files, keyed by path from the repo root
+FIXED_FILES = {
+    "repos/repo-orders/src/orders/checkout.ts": """// Fixed: Added timeout guard and retry logic
 export class CheckoutTimeoutError extends Error {}
 
 async function fakePaymentCall(ms: number): Promise<string> { 
@@ -129,26 +139,14 @@ export async function checkout(amount: number): Promise<string> {
   }
   return 'OK';
 }
-"""
-            with open(checkout_file, 'w') as f:
-                f.write(fixed_checkout)
-        
-        # Apply fixes to limits.py
-        limits_file = Path(repo_path) / "repos" / "repo-payments" / "service" / "payment" / "limits.py"
-        if limits_file.exists():
-            fixed_limits = """# Fixed: Added missing 'premium' tier
+""",
+    "repos/repo-payments/service/payment/limits.py": """# Fixed: Added missing 'premium' tier
 LIMITS = {
     'standard': {'max': 1000},
     'premium': {'max': 5000}  # Added missing tier
 }
-"""
-            with open(limits_file, 'w') as f:
-                f.write(fixed_limits)
-        
-        # Apply fixes to refund.py
-        refund_file = Path(repo_path) / "repos" / "repo-payments" / "service" / "payment" / "handlers" / "refund.py"
-        if refund_file.exists():
-            fixed_refund = """# Fixed: Safe dict access to prevent KeyError
+""",
+    "repos/repo-payments/service/payment/handlers/refund.py": """# Fixed: Safe dict access to prevent KeyError
 class RefundLimitExceededError(Exception): 
     pass
 
@@ -162,31 +160,136 @@ def refund_handler(user_tier: str, amount: float) -> str:
     if amount > bucket['max']:
         raise RefundLimitExceededError('limit exceeded')
     return 'OK'
-"""
-            with open(refund_file, 'w') as f:
-                f.write(fixed_refund)
-        
-        # Stage and commit fixes
-        subprocess.run(["git", "add", "."], cwd=repo_path, check=True)
-        subprocess.run(
-            ["git", "commit", "-m", "Fix: Add timeout guard, retry logic, and safe dict access"],
-            cwd=repo_path,
-            check=True
-        )
-        
-        # Get commit hash
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
+""",
+}
+
+
+def _git(args: List[str], cwd: str, input: Optional[str] = None) -> str:
+    # gc.auto=0: an automatic gc repacking refs would race the other worktrees
+    result = subprocess.run(
+        ["git", "-c", "gc.auto=0"] + args,
+        cwd=cwd,
+        input=input,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.strip()
+
+
+@contextmanager
+def repo_ref_lock(repo_path: str = "."):
+    """Exclusive per-repo lock for ref and worktree updates.
+
+    An flock on .rca_cache/git-refs.lock, so it serializes threads (each
+    opens its own descriptor) as well as processes and CLI runs.
+    """
+    lock_path = Path(repo_path) / CACHE_DIR / REF_LOCK_FILE
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def fix_branch(incident_id: str) -> str:
+    return f"{FIX_BRANCH_PREFIX}{incident_id}"
+
+
+def fix_base_ref(incident_id: str) -> str:
+    return f"{FIX_BASE_REF_PREFIX}{incident_id}"
+
+
+def _add_worktree(repo_path: str, worktree: Path, branch: str, base_ref: str) -> None:
+    # Called under repo_ref_lock: creates the branch ref (recording its base
+    # commit at base_ref) and the .git/worktrees entry
+    _git(["worktree", "prune"], repo_path)
+    if worktree.exists():
+        # Left over from an interrupted run
+        _remove_worktree(repo_path, worktree)
+    worktree.parent.mkdir(parents=True, exist_ok=True)
+    existing = resolve_commits([f"refs/heads/{branch}", base_ref], repo_path)
+    if f"refs/heads/{branch}" in existing:
+        _git(["worktree", "add", str(worktree), branch], repo_path)
+        if base_ref not in existing:
+            # Branch made before bases were recorded: its base is the parent
+            # of the fix commit, or the tip itself if no fix was committed
+            tip = _git(["rev-parse", f"{branch}^{{commit}}"], repo_path)
+            message = _git(["log", "-1", "--format=%B", tip], repo_path)
+            base = f"{tip}^" if message.startswith(FIX_COMMIT_MESSAGE) else tip
+            _git(["update-ref", base_ref, _git(["rev-parse", base], repo_path)], repo_path)
+    else:
+        base = _git(["rev-parse", "HEAD^{commit}"], repo_path)
+        _git(["worktree", "add", "-b", branch, str(worktree), base], repo_path)
+        _git(["update-ref", base_ref, base], repo_path)
+
+
+def _remove_worktree(repo_path: str, worktree: Path) -> None:
+    subprocess.run(["git", "worktree", "remove", "--force", str(worktree)],
+                   cwd=repo_path, capture_output=True)
+    shutil.rmtree(worktree, ignore_errors=True)
+
+
+def apply_fix_commit(incident_id: str, repo_path: str = ".") -> str:
+    """Apply fixes for an incident and commit them to its fix branch.
+
+    The fix is made in a private worktree (.rca_cache/worktrees/<id>) on
+    branch rca/fix/<id>, so the shared working tree is never touched and
+    fixes for different incidents run concurrently. Only the fixed files
+    are staged. Building the commit needs no lock; repo_ref_lock is held
+    just to add/remove the worktree and to move the branch ref. If the
+    files already hold the fixes (e.g. a re-run), the commit that has them
+    is returned instead of an empty commit. That is the branch's base
+    commit (see get_fix_base) when no fix was ever needed, which is how
+    callers tell a no-op from a real fix.
+    """
+    branch = fix_branch(incident_id)
+    worktree = Path(repo_path).resolve() / WORKTREE_DIR / incident_id
+    try:
+        with repo_ref_lock(repo_path):
+            _add_worktree(repo_path, worktree, branch, fix_base_ref(incident_id))
+        try:
+            staged = []
+            for relative_path, content in FIXED_FILES.items():
+                target = worktree / relative_path
+                if target.exists():
+                    target.write_text(content)
+                    staged.append(relative_path)
+            if staged:
+                _git(["add", "--"] + staged, str(worktree))
+
+            parent = _git(["rev-parse", "HEAD"], str(worktree))
+            tree = _git(["write-tree"], str(worktree))
+            if tree == _git(["rev-parse", "HEAD^{tree}"], str(worktree)):
+                return parent
+            message = f"{FIX_COMMIT_MESSAGE} ({incident_id})"
+            commit = _git(["commit-tree", tree, "-p", parent, "-m", message], str(worktree))
+            with repo_ref_lock(repo_path):
+                # Fails if the branch moved since parent was read
+                _git(["update-ref", "-m", "rca: apply fix", f"refs/heads/{branch}", commit, parent], repo_path)
+            return commit
+        finally:
+            with repo_ref_lock(repo_path):
+                _remove_worktree(repo_path, worktree)
     except (subprocess.CalledProcessError, FileNotFoundError):
         return "fix_commit_hash"
 
 
+def get_fix_commit(incident_id: str, repo_path: str = ".") -> Optional[str]:
+    """Head of an incident's fix branch, or None if no fix was applied."""
+    return get_git_reader(repo_path).resolve(f"refs/heads/{fix_branch(incident_id)}^{{commit}}")
+
+
+def get_fix_base(incident_id: str, repo_path: str = ".") -> Optional[str]:
+    """Commit an incident's fix branch was created from, or None if there is none.
+
+    apply_fix_commit returns this commit when the files needed no fix.
+    """
+    return get_git_reader(repo_path).resolve(f"{fix_base_ref(incident_id)}^{{commit}}")
+
+
 def update_releases_csv_with_commits(base_commit: str, bug_commit: str, repo_path: str = ".") -> None:
     """Update releases.csv with actual commit hashes."""
     try:
@@ -245,14 +348,335 @@ def get_git_log(repo_path: str = ".", max_commits: int = 10) -> str:
 
 def get_current_commit_hash(repo_path: str = ".") -> str:
     """Get current commit hash."""
+    return get_git_reader(repo_path).resolve("HEAD^{commit}") or "unknown_commit"
+
+
+RELEASE_CACHE_FILE = 'release_files.json'
+_release_cache: Dict[str, Dict[str, Optional[List[str]]]] = {}
+_release_cache_lock = threading.Lock()
+
+
+def resolve_commits(revisions: List[str], repo_path: str = ".") -> Dict[str, str]:
+    """Resolve revisions to commit hashes with one `git cat-file --batch-check`."""
+    if not revisions:
+        return {}
     try:
         result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
+            ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
             cwd=repo_path,
+            input="".join(f"{rev}^{{commit}}\n" for rev in revisions),
             capture_output=True,
             text=True,
             check=True
         )
-        return result.stdout.strip()
     except (subprocess.CalledProcessError, FileNotFoundError):
-        return "unknown_commit"
+        return {}
+    resolved = {}
+    for rev, line in zip(revisions, result.stdout.splitlines()):
+        parts = line.split()
+        if len(parts) == 2 and parts[1] == 'commit':
+            resolved[rev] = parts[0]
+    return resolved
+
+
+def _load_release_cache(repo_path: str) -> Dict[str, Optional[List[str]]]:
+    with _release_cache_lock:
+        if repo_path not in _release_cache:
+            cache_file = Path(repo_path) / CACHE_DIR / RELEASE_CACHE_FILE
+            try:
+                _release_cache[repo_path] = json.loads(cache_file.read_text())
+            except (OSError, ValueError):
+                _release_cache[repo_path] = {}
+        return _release_cache[repo_path]
+
+
+def _store_release_cache(repo_path: str, row_key: str, key: str, files: Optional[List[str]]) -> None:
+    with _release_cache_lock:
+        cache = _release_cache.setdefault(repo_path, {})
+        # Entries for the same release row with since-moved tags are dead
+        for stale in [k for k in cache if k.startswith(row_key + "@") and k != key]:
+            del cache[stale]
+        cache[key] = files
+        cache_file = Path(repo_path) / CACHE_DIR / RELEASE_CACHE_FILE
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_file.write_text(json.dumps(cache, indent=1, sort_keys=True))
+            tmp_file.replace(cache_file)
+        except OSError as e:
+            print(f"Warning: Could not write release cache: {e}")
+
+
+def get_release_changed_files(release: Dict[str, str], previous: Optional[Dict[str, str]] = None,
+                              repo_path: str = ".") -> Optional[List[str]]:
+    """Return files changed in a release, or None if git has no record of it.
+
+    The release covers previous_tag..release_tag when both tags exist.
+    Otherwise it covers the commits listed in releases.csv, and failing
+    that the tagged commit alone. Revisions are resolved over the shared
+    cat-file pipe and the changed-file list comes from a single `git log`
+    invocation. Results, misses included, are cached on disk keyed by the
+    release row and the commit ids its revisions resolved to, so a tag
+    created or moved later is picked up while repeat lookups only
+    re-resolve the revisions.
+    """
+    commits = [c.strip() for c in release.get('commits', '').split(';') if c.strip()]
+    previous_tag = previous['release_tag'] if previous else ''
+    tag = release['release_tag']
+    row_key = "|".join([release['service'], tag, previous_tag, ";".join(commits)])
+
+    reader = get_git_reader(repo_path)
+    revisions = [tag] + ([previous_tag] if previous_tag else []) + commits
+    resolved = {}
+    for rev in revisions:
+        oid = reader.resolve(f"{rev}^{{commit}}")
+        if oid:
+            resolved[rev] = oid
+    key = row_key + "@" + ";".join(resolved.get(rev, "-") for rev in revisions)
+
+    cache = _load_release_cache(repo_path)
+    if key in cache:
+        return cache[key]
+
+    if tag in resolved and previous_tag in resolved:
+        revisions = [resolved[tag], f"^{resolved[previous_tag]}"]
+    elif any(c in resolved for c in commits):
+        revisions = ["--no-walk"] + [resolved[c] for c in commits if c in resolved]
+    elif tag in resolved:
+        revisions = ["--no-walk", resolved[tag]]
+    else:
+        revisions = None
+
+    files = None
+    if revisions is not None:
+        try:
+            output = _git(["log", "--name-only", "--format="] + revisions + ["--"], repo_path)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        files = sorted({line.strip() for line in output.splitlines() if line.strip()})
+
+    _store_release_cache(repo_path, row_key, key, files)
+    return files
+
+
+GIT_READER_CACHE_BYTES = 32 * 1024 * 1024
+TREE_MODE = b'40000'
+
+
+class GitBatchError(RuntimeError):
+    """The object does not exist or the cat-file process failed."""
+
+
+class GitBatchReader:
+    """Read git objects for one repo over a single long-lived pipe.
+
+    Runs `git cat-file --batch-command`: ``info`` resolves a revision
+    (names such as HEAD or a branch are resolved on every call, since they
+    move) and ``contents`` reads an object. Objects are immutable, so
+    their contents, parsed commits and changed-file lists are kept in an
+    LRU keyed by object id and bounded by total bytes. The process is
+    started on first use and restarted if it dies; requests are
+    serialized by a lock.
+    """
+
+    def __init__(self, repo_path: str = ".", max_bytes: int = GIT_READER_CACHE_BYTES):
+        self.repo_path = repo_path
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.spawns = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[object, int]]" = OrderedDict()
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _process(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch-command"],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            self.spawns += 1
+        return self._proc
+
+    def _command(self, command: str, rev: str) -> Tuple[str, str, Optional[bytes]]:
+        """Send one command; returns (oid, type, contents or None)."""
+        if '\n' in rev:
+            raise GitBatchError(f"Invalid revision: {rev!r}")
+        with self._lock:
+            try:
+                proc = self._process()
+                proc.stdin.write(f"{command} {rev}\n".encode())
+                proc.stdin.flush()
+                header = proc.stdout.readline()
+                if not header:
+                    raise GitBatchError(f"git cat-file exited in {self.repo_path}")
+                parts = header.split()
+                if len(parts) != 3 or not parts[2].isdigit():
+                    raise GitBatchError(f"{rev}: {header.decode(errors='replace').strip()}")
+                data = None
+                if command == 'contents':
+                    size = int(parts[2])
+                    data = proc.stdout.read(size + 1)[:size]
+            except (OSError, ValueError) as e:
+                self._close()
+                raise GitBatchError(f"git cat-file failed for {rev}: {e}") from e
+        return parts[0].decode(), parts[1].decode(), data
+
+    def _cached(self, kind: str, oid: str, build):
+        key = (kind, oid)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value, size = build()
+        with self._lock:
+            if size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (value, size)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    _, (_, old_size) = self._entries.popitem(last=False)
+                    self.current_bytes -= old_size
+        return value
+
+    def resolve(self, rev: str) -> Optional[str]:
+        """Object id for a revision, or None if it does not exist."""
+        try:
+            return self._command('info', rev)[0]
+        except GitBatchError:
+            return None
+
+    def read_object(self, rev: str) -> Tuple[str, bytes]:
+        """(type, contents) of the object a revision names."""
+        if len(rev) in (40, 64) and all(c in '0123456789abcdef' for c in rev):
+            oid = rev
+        else:
+            oid = self._command('info', rev)[0]
+
+        def build():
+            _, kind, data = self._command('contents', oid)
+            return (kind, data), len(data)
+        return self._cached('object', oid, build)
+
+    def read_blob(self, rev: str, path: str) -> Optional[str]:
+        """Text of path at a revision, or None if it is missing there."""
+        try:
+            kind, data = self.read_object(f"{rev}:{path}")
+        except GitBatchError:
+            return None
+        return data.decode('utf-8', errors='replace') if kind == 'blob' else None
+
+    def commit_info(self, rev: str) -> Dict[str, object]:
+        """Parsed commit: oid, tree, parents, author, committer, subject, message."""
+        oid = self._command('info', f"{rev}^{{commit}}")[0]
+
+        def build():
+            _, data = self.read_object(oid)
+            header, _, message = data.decode('utf-8', errors='replace').partition('\n\n')
+            info = {'oid': oid, 'tree': None, 'parents': [], 'author': '', 'committer': ''}
+            for line in header.splitlines():
+                field, _, value = line.partition(' ')
+                if field == 'parent':
+                    info['parents'].append(value)
+                elif field in ('tree', 'author', 'committer'):
+                    info[field] = value
+            # Same as `git log --format=%s`: the first paragraph on one line
+            info['subject'] = ' '.join(message.split('\n\n', 1)[0].split('\n')).strip()
+            info['message'] = message
+            return info, len(data)
+        return self._cached('commit', oid, build)
+
+    def _tree_entries(self, oid: Optional[str]) -> Dict[str, Tuple[bytes, str]]:
+        if oid is None:
+            return {}
+        _, data = self.read_object(oid)
+        oid_size = len(oid) // 2
+        entries = {}
+        offset = 0
+        while offset < len(data):
+            space = data.index(b' ', offset)
+            nul = data.index(b'\0', space)
+            name = data[space + 1:nul].decode('utf-8', errors='replace')
+            entries[name] = (data[offset:space], data[nul + 1:nul + 1 + oid_size].hex())
+            offset = nul + 1 + oid_size
+        return entries
+
+    def _diff_trees(self, old: Optional[str], new: Optional[str], prefix: str = '') -> List[str]:
+        old_entries, new_entries = self._tree_entries(old), self._tree_entries(new)
+        changed = []
+        for name in set(old_entries) | set(new_entries):
+            old_mode, old_oid = old_entries.get(name, (None, None))
+            new_mode, new_oid = new_entries.get(name, (None, None))
+            if (old_mode, old_oid) == (new_mode, new_oid):
+                continue
+            path = prefix + name
+            old_tree = old_oid if old_mode == TREE_MODE else None
+            new_tree = new_oid if new_mode == TREE_MODE else None
+            if old_tree or new_tree:
+                changed.extend(self._diff_trees(old_tree, new_tree, path + '/'))
+            if (old_oid and not old_tree) or (new_oid and not new_tree):
+                changed.append(path)
+        return changed
+
+    def changed_files(self, rev: str) -> List[str]:
+        """Files a commit changed relative to its first parent (all files for a root commit)."""
+        info = self.commit_info(rev)
+
+        def build():
+            parent_tree = None
+            if info['parents']:
+                parent_tree = self.commit_info(info['parents'][0])['tree']
+            files = sorted(set(self._diff_trees(parent_tree, info['tree'])))
+            return files, sum(len(f) for f in files)
+        return self._cached('changed', info['oid'], build)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters, process spawns and current usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'spawns': self.spawns,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.wait()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_git_readers: Dict[str, GitBatchReader] = {}
+_git_readers_lock = threading.Lock()
+
+
+def get_git_reader(repo_path: str = ".") -> GitBatchReader:
+    """Return the process-wide reader for a repository."""
+    key = os.path.realpath(repo_path)
+    with _git_readers_lock:
+        reader = _git_readers.get(key)
+        if reader is None:
+            reader = _git_readers[key] = GitBatchReader(key)
+        return reader
+
+
+@atexit.register
+def _close_git_readers() -> None:
+    for reader in list(_git_readers.values()):
+        reader.close()
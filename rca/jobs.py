@@ -0,0 +1,214 @@
+"""Run pipeline operations as background jobs on bounded per-operation pools."""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Concurrent jobs per operation; override with RCA_JOB_LIMIT_<OPERATION>,
+# e.g. RCA_JOB_LIMIT_TRIAGE=8
+DEFAULT_LIMITS = {
+    'triage': 4,
+    'initial_rca': 2,
+    'final_rca': 2,
+    'draft_pr': 2,
+    'ticket': 4,
+    'apply_fix': 4,
+    'compare': 2,
+    'demo': 1,
+}
+JOB_HISTORY = 500
+# Fields of the final 'job' event; the stream ends after it
+TERMINAL_EVENT_FIELDS = ('job_id', 'status', 'queue_ms', 'run_ms', 'result', 'error')
+
+
+def operation_limit(operation: str) -> int:
+    """Concurrency limit for an operation (environment override or default)."""
+    value = os.getenv(f'RCA_JOB_LIMIT_{operation.upper()}')
+    try:
+        limit = int(value) if value else DEFAULT_LIMITS.get(operation, 2)
+    except ValueError:
+        limit = DEFAULT_LIMITS.get(operation, 2)
+    return max(1, limit)
+
+
+def _run_job(job: 'Job', func: Callable[..., Any], *args) -> Dict[str, Any]:
+    """Run func and record its wall-clock start/finish."""
+    job.events.publish('job', {'job_id': job.id, 'status': 'running'})
+    started_at = time.time()
+    result = func(*args)
+    return {'result': result, 'started_at': started_at, 'finished_at': time.time()}
+
+
+class JobEvents:
+    """Append-only event log for one job with asyncio subscribers.
+
+    Events are published from worker threads and delivered to each
+    subscriber's asyncio queue on its own loop. Every event gets a
+    sequential id so a reconnecting client can resume after the last one
+    it saw.
+    """
+
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = {'id': len(self._events) + 1, 'event': event, 'data': data}
+            self._events.append(entry)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, entry)
+            except RuntimeError:
+                # Subscriber's loop already closed
+                pass
+
+    def subscribe(self, after_id: int = 0) -> Tuple[List[Dict[str, Any]], asyncio.Queue]:
+        """Return the backlog after after_id and a queue for later events.
+
+        Must be called from the subscriber's event loop.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            backlog = self._events[after_id:]
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return backlog, queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+
+
+class Job:
+    """One submitted operation, its future and its event log."""
+
+    def __init__(self, operation: str, incident: Optional[str]):
+        self.id = uuid.uuid4().hex[:12]
+        self.operation = operation
+        self.incident = incident
+        self.submitted_at = time.time()
+        self.completed_at: Optional[float] = None
+        self.events = JobEvents()
+        self.future: Optional[Future] = None
+
+    def attach(self, future: Future) -> None:
+        self.future = future
+        future.add_done_callback(self._mark_completed)
+
+    def _mark_completed(self, future: Future) -> None:
+        self.completed_at = time.time()
+        summary = self.to_dict()
+        self.events.publish('job', {key: summary[key] for key in TERMINAL_EVENT_FIELDS})
+
+    @property
+    def finished(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    @property
+    def status(self) -> str:
+        if self.future is None:
+            return 'queued'
+        if self.future.cancelled():
+            return 'cancelled'
+        if self.future.done():
+            return 'failed' if self.future.exception() is not None else 'succeeded'
+        return 'running' if self.future.running() else 'queued'
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'operation': self.operation,
+            'incident': self.incident,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': None,
+            'finished_at': None,
+            'queue_ms': None,
+            'run_ms': None,
+            'result': None,
+            'error': None,
+        }
+        if not self.finished or self.future.cancelled():
+            return data
+        error = self.future.exception()
+        if error is not None:
+            # The worker's own timestamps are lost with the exception
+            data['error'] = f"{type(error).__name__}: {error}"
+            data['finished_at'] = self.completed_at
+            return data
+        outcome = self.future.result()
+        data.update(
+            started_at=outcome['started_at'],
+            finished_at=outcome['finished_at'],
+            queue_ms=round((outcome['started_at'] - self.submitted_at) * 1000, 3),
+            run_ms=round((outcome['finished_at'] - outcome['started_at']) * 1000, 3),
+            result=outcome['result'],
+        )
+        return data
+
+
+class JobManager:
+    """Submit pipeline stages to bounded thread pools and look jobs up by ID.
+
+    Each operation gets its own executor sized by operation_limit, so a
+    burst of slow fixes cannot starve triage. Only the last JOB_HISTORY
+    finished jobs are kept.
+    """
+
+    def __init__(self):
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _executor(self, operation: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(operation)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=operation_limit(operation),
+                                          thread_name_prefix=f'rca-{operation}')
+            self._executors[operation] = executor
+        return executor
+
+    def submit(self, operation: str, func: Callable[..., Any], *args,
+               incident: Optional[str] = None, with_events: bool = False) -> Job:
+        """Queue func(*args) on the operation's pool.
+
+        With with_events=True the job's ``events.publish`` is passed as an
+        extra last argument so the stage can report progress.
+        """
+        job = Job(operation, incident)
+        if with_events:
+            args = args + (job.events.publish,)
+        job.events.publish('job', {'job_id': job.id, 'status': 'queued'})
+        with self._lock:
+            job.attach(self._executor(operation).submit(_run_job, job, func, *args))
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - JOB_HISTORY)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def limits(self) -> Dict[str, int]:
+        return {operation: operation_limit(operation) for operation in DEFAULT_LIMITS}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
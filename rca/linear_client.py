@@ -4,6 +4,7 @@ import json
 import requests
 from pathlib import Path
 from typing import Dict, Any, Optional
+from .artifacts import precompress
 from .schema import TicketData
 
 
@@ -176,6 +177,7 @@ def create_mock_linear_ticket(ticket_data: TicketData, config: Dict[str, Optiona
     ticket_file = mock_dir / f"{ticket_id}.json"
     with open(ticket_file, 'w') as f:
         json.dump(mock_ticket, f, indent=2)
+    precompress(ticket_file)
     
     return {
         'success': True,
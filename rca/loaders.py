@@ -1,11 +1,20 @@
 """Functions to read CSV/YAML/MD files and repo source files."""
 import json
 import csv
+import hashlib
+import mmap
+import os
+import threading
 import yaml
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Callable, Optional, Tuple, Union
 from .schema import Incident
 
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from .logindex import LogIndex
+
 
 def load_incident(incident_path: str) -> Incident:
     """Load incident from JSON file."""
@@ -14,10 +23,10 @@ def load_incident(incident_path: str) -> Incident:
     return Incident(**data)
 
 
-def load_services() -> Dict[str, Dict[str, str]]:
+def load_services(path: str = 'data/services.csv') -> Dict[str, Dict[str, str]]:
     """Load services mapping from CSV."""
     services = {}
-    with open('data/services.csv', 'r') as f:
+    with open(path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
             services[row['service']] = {
@@ -27,62 +36,399 @@ def load_services() -> Dict[str, Dict[str, str]]:
     return services
 
 
-def load_routes() -> Dict[str, Dict[str, str]]:
+def load_routes(path: str = 'data/routes_openapi.yaml') -> Dict[str, Dict[str, str]]:
     """Load routes mapping from YAML."""
-    with open('data/routes_openapi.yaml', 'r') as f:
+    with open(path, 'r') as f:
         return yaml.safe_load(f)
 
 
-def load_jobs() -> List[Dict[str, str]]:
+def load_jobs(path: str = 'data/jobs_registry.csv') -> List[Dict[str, str]]:
     """Load jobs registry from CSV."""
     jobs = []
-    with open('data/jobs_registry.csv', 'r') as f:
+    with open(path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
             jobs.append(dict(row))
     return jobs
 
 
-def load_error_index() -> List[Dict[str, str]]:
+def load_error_index(path: str = 'data/error_index.csv') -> List[Dict[str, str]]:
     """Load error index from CSV."""
     errors = []
-    with open('data/error_index.csv', 'r') as f:
+    with open(path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
             errors.append(dict(row))
     return errors
 
 
-def load_releases() -> List[Dict[str, str]]:
+def load_releases(path: str = 'data/releases.csv') -> List[Dict[str, str]]:
     """Load releases from CSV."""
     releases = []
-    with open('data/releases.csv', 'r') as f:
+    with open(path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
             releases.append(dict(row))
     return releases
 
 
-def load_logs() -> List[Dict[str, str]]:
+def load_logs(path: str = 'data/logs_mock.csv') -> List[Dict[str, str]]:
     """Load mock logs from CSV."""
     logs = []
-    with open('data/logs_mock.csv', 'r') as f:
+    with open(path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
             logs.append(dict(row))
     return logs
 
 
-def load_guidelines() -> List[Dict[str, str]]:
+def load_guidelines(path: str = 'docs/guidelines.csv') -> List[Dict[str, str]]:
     """Load code guidelines from CSV."""
     guidelines = []
-    with open('docs/guidelines.csv', 'r') as f:
+    with open(path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
             guidelines.append(dict(row))
     return guidelines
 
 
+CACHE_DIR = '.rca_cache'
+LOG_CHUNK_SIZE = 32 * 1024 * 1024
+_log_pool: Optional['ProcessPoolExecutor'] = None
+_log_pool_lock = threading.Lock()
+
+
+def _get_log_pool(workers: int) -> 'ProcessPoolExecutor':
+    """Return the shared process pool used for log scanning."""
+    global _log_pool
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _log_pool_lock:
+        if _log_pool is None:
+            # Spawned rather than forked: callers run this from threaded servers
+            _log_pool = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _log_pool
+
+
+def _scan_log_chunk(path: str, start: int, end: int, fields: List[str],
+                    criteria: List[Tuple[str, str]]) -> List[Tuple[int, Dict[str, str]]]:
+    """Return (offset, row) for rows in [start, end) matching any criterion.
+
+    The chunk is searched for the raw bytes of each wanted value first, and
+    only the lines containing a hit are decoded and parsed as CSV.
+    """
+    hits = set()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for needle in {value.encode() for _, value in criteria}:
+            pos = mm.find(needle, start, end)
+            while pos != -1:
+                newline = mm.rfind(b'\n', start, pos)
+                line_start = newline + 1 if newline != -1 else start
+                line_end = mm.find(b'\n', pos, end)
+                if line_end == -1:
+                    line_end = end
+                hits.add((line_start, line_end))
+                pos = mm.find(needle, line_end, end)
+
+        matches = []
+        for line_start, line_end in sorted(hits):
+            line = mm[line_start:line_end].decode('utf-8', 'replace').rstrip('\r')
+            row = dict(zip(fields, next(csv.reader([line]), [])))
+            if any(row.get(column) == value for column, value in criteria):
+                matches.append((line_start, row))
+    return matches
+
+
+class LogSource:
+    """Memory-mapped, chunked scanner over a CSV log file.
+
+    The file is split on line boundaries into chunks of ``chunk_size``
+    bytes. A file that fits in one chunk is scanned in-process; larger files
+    are scanned across a process pool with a bounded number of chunks in
+    flight, so peak memory depends on the chunk size and the number of
+    matches, not on the size of the log. Rows must not contain embedded
+    newlines.
+
+    When a persistent ``LogIndex`` covers the file (see ``rca.cli
+    index-logs``), the indexed prefix is served by offset lookups and only
+    lines appended since the last index update are scanned.
+    """
+
+    def __init__(self, path: str = 'data/logs_mock.csv', chunk_size: int = LOG_CHUNK_SIZE,
+                 workers: Optional[int] = None, index: Optional['LogIndex'] = None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.index = index
+
+    def _layout(self, offset: int = 0) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """Return the header fields and line-aligned (start, end) chunks after offset."""
+        size = os.path.getsize(self.path)
+        if size == 0:
+            return [], []
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = mm.find(b'\n')
+            if header_end == -1:
+                header_end = size
+            header = mm[:header_end].decode('utf-8', 'replace').rstrip('\r')
+            fields = next(csv.reader([header]), [])
+
+            chunks = []
+            start = min(max(header_end + 1, offset), size)
+            while start < size:
+                end = min(start + self.chunk_size, size)
+                if end < size:
+                    newline = mm.find(b'\n', end)
+                    end = size if newline == -1 else newline + 1
+                chunks.append((start, end))
+                start = end
+        return fields, chunks
+
+    def scan(self, request_id: Optional[str] = None,
+             session_id: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        """Yield log rows whose request_id or session_id matches, in file order."""
+        criteria = [(column, value) for column, value in
+                    (('request_id', request_id), ('session_id', session_id)) if value]
+        if not criteria or not os.path.exists(self.path):
+            return
+
+        indexed_offset = 0
+        status = self.index.status(self.path) if self.index else None
+        if status:
+            indexed_offset, fields = status
+            yield from self._read_indexed(fields, criteria)
+
+        fields, chunks = self._layout(indexed_offset)
+
+        if len(chunks) <= 1 or self.workers <= 1:
+            for start, end in chunks:
+                for _, row in _scan_log_chunk(self.path, start, end, fields, criteria):
+                    yield row
+            return
+
+        pool = _get_log_pool(self.workers)
+        pending = deque()
+        chunk_iter = iter(chunks)
+        for start, end in chunk_iter:
+            pending.append(pool.submit(_scan_log_chunk, self.path, start, end, fields, criteria))
+            if len(pending) >= self.workers * 2:
+                break
+        while pending:
+            matches = pending.popleft().result()
+            next_chunk = next(chunk_iter, None)
+            if next_chunk is not None:
+                pending.append(pool.submit(_scan_log_chunk, self.path, *next_chunk, fields, criteria))
+            for _, row in matches:
+                yield row
+
+    def _read_indexed(self, fields: List[str],
+                      criteria: List[Tuple[str, str]]) -> Iterator[Dict[str, str]]:
+        """Yield rows from the indexed prefix of the file via their offsets."""
+        offsets = set()
+        for column, value in criteria:
+            offsets.update(self.index.offsets(self.path, column, value))
+        if not offsets:
+            return
+        with open(self.path, 'rb') as f:
+            for offset in sorted(offsets):
+                f.seek(offset)
+                line = f.readline().decode('utf-8', 'replace').rstrip('\r\n')
+                yield dict(zip(fields, next(csv.reader([line]), [])))
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+IndexKey = Union[str, Tuple[str, ...]]
+
+
+def build_index(rows: List[Dict[str, str]], key: IndexKey) -> Dict[Any, List[Dict[str, str]]]:
+    """Group rows by a column (or a tuple of columns), keeping file order."""
+    index: Dict[Any, List[Dict[str, str]]] = {}
+    if isinstance(key, tuple):
+        for row in rows:
+            index.setdefault(tuple(row.get(k) for k in key), []).append(row)
+    else:
+        for row in rows:
+            index.setdefault(row.get(key), []).append(row)
+    return index
+
+
+def build_previous_releases(rows: List[Dict[str, str]]) -> Dict[int, Optional[Dict[str, str]]]:
+    """Map each release row (by id) to the service's release before it in file order.
+
+    Rows are keyed by identity because they are dicts; the mapping is only
+    valid for the map it was built from, which KnowledgeBase.derive ensures.
+    """
+    previous: Dict[int, Optional[Dict[str, str]]] = {}
+    last: Dict[Optional[str], Dict[str, str]] = {}
+    for row in rows:
+        service = row.get('service')
+        previous[id(row)] = last.get(service)
+        last[service] = row
+    return previous
+
+
+class KnowledgeBase:
+    """Process-wide cache of the data maps used for correlation and analysis.
+
+    Each map is loaded on first access and reloaded only when the mtime or
+    size of its own source file changes. ``version`` is bumped on every
+    (re)load so downstream caches can key on it. Secondary indexes listed
+    in ``INDEXES`` are rebuilt together with their map so lookups by those
+    columns are O(1), and objects built with ``derive`` (compiled matchers,
+    rule sets) are rebuilt only when their map changes.
+    """
+
+    SOURCES = {
+        'services': ('data/services.csv', load_services),
+        'routes': ('data/routes_openapi.yaml', load_routes),
+        'jobs': ('data/jobs_registry.csv', load_jobs),
+        'error_index': ('data/error_index.csv', load_error_index),
+        'releases': ('data/releases.csv', load_releases),
+        'guidelines': ('docs/guidelines.csv', load_guidelines),
+    }
+
+    INDEXES = {
+        'jobs': ('job_id', 'workflow_id'),
+        'releases': (('service', 'release_tag'),),
+    }
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._maps: Dict[str, Any] = {}
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._indexes: Dict[str, Dict[IndexKey, Dict[Any, List[Dict[str, str]]]]] = {}
+        self._map_versions: Dict[str, int] = {}
+        self._derived: Dict[Tuple[str, Callable], Tuple[int, Any]] = {}
+        self._version = 0
+        self._log_source: Optional['LogSource'] = None
+
+    def get(self, name: str) -> Any:
+        """Return a map by name, reloading it if its file changed."""
+        path, loader = self.SOURCES[name]
+        stamp = _file_stamp(path)
+        with self._lock:
+            if name in self._maps and self._stamps[name] == stamp:
+                return self._maps[name]
+            value = loader(path)
+            self._indexes[name] = {
+                key: build_index(value, key) for key in self.INDEXES.get(name, ())
+            }
+            self._maps[name] = value
+            self._stamps[name] = stamp
+            self._map_versions[name] = self._map_versions.get(name, 0) + 1
+            self._version += 1
+            return value
+
+    def refresh(self) -> None:
+        """Re-check every loaded map and reload the ones that changed."""
+        for name in list(self._maps):
+            self.get(name)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one map (or all maps) so the next access reloads it."""
+        with self._lock:
+            names = [name] if name else list(self._maps)
+            for key in names:
+                self._maps.pop(key, None)
+                self._stamps.pop(key, None)
+                self._indexes.pop(key, None)
+
+    def lookup(self, name: str, key: IndexKey, value: Any) -> List[Dict[str, str]]:
+        """Return the rows of a map whose indexed column(s) equal value."""
+        with self._lock:
+            self.get(name)
+            return self._indexes[name][key].get(value, [])
+
+    def derive(self, name: str, builder: Callable[[Any], Any]) -> Any:
+        """Return builder(map), cached until the map is reloaded."""
+        with self._lock:
+            value = self.get(name)
+            version = self._map_versions[name]
+            cached = self._derived.get((name, builder))
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            result = builder(value)
+            self._derived[(name, builder)] = (version, result)
+            return result
+
+    def fingerprint(self) -> str:
+        """Digest of every map's (and the log file's) mtime/size.
+
+        Unlike ``version``, which counts reloads within one process, this is
+        stable across processes and suits on-disk cache keys.
+        """
+        paths = [path for path, _ in self.SOURCES.values()] + [self.log_source.path]
+        stamps = repr([(path, _file_stamp(path)) for path in paths])
+        return hashlib.sha1(stamps.encode()).hexdigest()[:16]
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever any map is (re)loaded."""
+        self.refresh()
+        return self._version
+
+    def map_version(self, name: str) -> int:
+        """Counter bumped whenever the given map is (re)loaded."""
+        self.get(name)
+        return self._map_versions[name]
+
+    @property
+    def services(self) -> Dict[str, Dict[str, str]]:
+        return self.get('services')
+
+    @property
+    def routes(self) -> Dict[str, Dict[str, str]]:
+        return self.get('routes')
+
+    @property
+    def jobs(self) -> List[Dict[str, str]]:
+        return self.get('jobs')
+
+    @property
+    def error_index(self) -> List[Dict[str, str]]:
+        return self.get('error_index')
+
+    @property
+    def releases(self) -> List[Dict[str, str]]:
+        return self.get('releases')
+
+    @property
+    def log_source(self) -> 'LogSource':
+        """Streaming view of the log file; logs are never loaded whole."""
+        if self._log_source is None:
+            from .logindex import LogIndex
+            self._log_source = LogSource(index=LogIndex())
+        return self._log_source
+
+    @property
+    def guidelines(self) -> List[Dict[str, str]]:
+        return self.get('guidelines')
+
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_knowledge_base_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Return the process-wide knowledge base, creating it on first use."""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _knowledge_base_lock:
+            if _knowledge_base is None:
+                _knowledge_base = KnowledgeBase()
+    return _knowledge_base
+
+
 def load_prd_yaml(feature: str) -> Optional[Dict[str, Any]]:
     """Load PRD YAML file for a feature."""
     prd_path = f'docs/prd/{feature}.yml'
@@ -92,13 +438,93 @@ def load_prd_yaml(feature: str) -> Optional[Dict[str, Any]]:
     return None
 
 
-def load_repo_file(repo: str, file_path: str) -> Optional[str]:
-    """Load source code file from repo."""
-    full_path = f'repos/{repo}/{file_path}'
-    if Path(full_path).exists():
+REPO_FILE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class FileContentCache:
+    """Size-bounded LRU of repository file contents.
+
+    Entries are keyed by (repo, path, mtime_ns, size), so an edited file is
+    simply a miss and its stale entry is dropped. The bound is on total
+    bytes, not on the number of entries; a single file larger than the
+    bound is returned but never cached.
+    """
+
+    def __init__(self, max_bytes: int = REPO_FILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, int, int], str]" = OrderedDict()
+        self._latest: Dict[Tuple[str, str], Tuple[str, str, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, repo: str, file_path: str) -> Optional[str]:
+        """Return file contents from repos/<repo>/<file_path>, or None if missing."""
+        full_path = f'repos/{repo}/{file_path}'
+        stamp = _file_stamp(full_path)
+        if stamp is None:
+            return None
+        key = (repo, file_path) + stamp
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return content
+            self.misses += 1
+
         with open(full_path, 'r') as f:
-            return f.read()
-    return None
+            content = f.read()
+
+        size = stamp[1]
+        if size > self.max_bytes:
+            return content
+        with self._lock:
+            stale = self._latest.get((repo, file_path))
+            if stale is not None and stale != key and stale in self._entries:
+                self.current_bytes -= stale[3]
+                del self._entries[stale]
+            if key not in self._entries:
+                self._entries[key] = content
+                self.current_bytes += size
+            self._latest[(repo, file_path)] = key
+            while self.current_bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self.current_bytes -= old_key[3]
+                if self._latest.get(old_key[:2]) == old_key:
+                    del self._latest[old_key[:2]]
+        return content
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self.current_bytes = 0
+
+
+_repo_file_cache = FileContentCache()
+
+
+def get_repo_file_cache() -> FileContentCache:
+    """Return the process-wide repository file cache."""
+    return _repo_file_cache
+
+
+def load_repo_file(repo: str, file_path: str) -> Optional[str]:
+    """Load source code file from repo (served from the shared LRU cache)."""
+    return _repo_file_cache.get(repo, file_path)
 
 
 def get_file_extension(file_path: str) -> str:
@@ -0,0 +1,126 @@
+"""Persistent request_id/session_id -> byte offset index for log files."""
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+from .loaders import CACHE_DIR
+
+DEFAULT_INDEX_PATH = f'{CACHE_DIR}/log_index.sqlite'
+INDEXED_COLUMNS = ('request_id', 'session_id')
+HEAD_BYTES = 4096
+BATCH_ROWS = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    indexed_offset INTEGER NOT NULL,
+    fields TEXT NOT NULL,
+    head_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT NOT NULL,
+    column TEXT NOT NULL,
+    value TEXT NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lookup ON entries (path, column, value);
+"""
+
+
+def _head_hash(path: str, length: int) -> str:
+    """Hash the first bytes of a file to detect rotation or truncation."""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(min(length, HEAD_BYTES))).hexdigest()
+
+
+class LogIndex:
+    """SQLite index mapping request_id/session_id values to line offsets.
+
+    Log files only grow, so ``update`` indexes from the last indexed offset
+    onwards. If a file shrank or its first bytes changed (rotation), it is
+    reindexed from scratch. Only complete lines are indexed; a trailing
+    partial line is picked up by the next update.
+    """
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH):
+        self.index_path = index_path
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.index_path)
+        conn.executescript(SCHEMA)
+        return conn
+
+    def status(self, log_path: str) -> Optional[Tuple[int, List[str]]]:
+        """Return (indexed_offset, fields) if the index is valid for log_path."""
+        if not os.path.exists(self.index_path) or not os.path.exists(log_path):
+            return None
+        key = os.path.abspath(log_path)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT indexed_offset, fields, head_hash FROM files WHERE path = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        indexed_offset, fields, head_hash = row
+        if os.path.getsize(log_path) < indexed_offset or _head_hash(log_path, indexed_offset) != head_hash:
+            return None
+        return indexed_offset, json.loads(fields)
+
+    def update(self, log_path: str) -> Dict[str, int]:
+        """Index lines appended to log_path since the last update."""
+        key = os.path.abspath(log_path)
+        status = self.status(log_path)
+        rebuilt = status is None
+        added = 0
+
+        with closing(self._connect()) as conn, conn, open(log_path, 'rb') as f:
+            if rebuilt:
+                conn.execute("DELETE FROM entries WHERE path = ?", (key,))
+                conn.execute("DELETE FROM files WHERE path = ?", (key,))
+                header = f.readline()
+                if not header.endswith(b'\n'):
+                    # No complete header yet; nothing to index
+                    return {'rows_added': 0, 'indexed_offset': 0, 'rebuilt': 1}
+                fields = next(csv.reader([header.decode('utf-8', 'replace').rstrip('\r\n')]), [])
+                offset = len(header)
+            else:
+                offset, fields = status
+            f.seek(offset)
+
+            columns = [(name, fields.index(name)) for name in INDEXED_COLUMNS if name in fields]
+            batch = []
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                values = next(csv.reader([line.decode('utf-8', 'replace').rstrip('\r\n')]), [])
+                for name, position in columns:
+                    if position < len(values) and values[position]:
+                        batch.append((key, name, values[position], offset))
+                offset += len(line)
+                added += 1
+                if len(batch) >= BATCH_ROWS:
+                    conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)", batch)
+                    batch = []
+            if batch:
+                conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)", batch)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                (key, offset, json.dumps(fields), _head_hash(log_path, offset))
+            )
+
+        return {'rows_added': added, 'indexed_offset': offset, 'rebuilt': int(rebuilt)}
+
+    def offsets(self, log_path: str, column: str, value: str) -> List[int]:
+        """Return the line offsets where column equals value."""
+        key = os.path.abspath(log_path)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT offset FROM entries WHERE path = ? AND column = ? AND value = ? ORDER BY offset",
+                (key, column, value)
+            ).fetchall()
+        return [row[0] for row in rows]
@@ -0,0 +1,162 @@
+"""Render PDFs from saved markdown in the background, skipping unchanged ones."""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional
+from .loaders import CACHE_DIR
+
+PDF_STAMP_DIR = f'{CACHE_DIR}/pdf'
+# Background render processes; override with RCA_PDF_WORKERS
+PDF_WORKERS = 2
+
+
+def pdf_workers() -> int:
+    try:
+        return max(1, int(os.getenv('RCA_PDF_WORKERS') or PDF_WORKERS))
+    except ValueError:
+        return PDF_WORKERS
+
+
+def _stamp_path(pdf_path: str) -> str:
+    # .rca_cache/pdf/<pdf path relative to the cwd>.json
+    relative = os.path.relpath(os.path.abspath(pdf_path))
+    if relative.startswith(os.pardir):
+        relative = os.path.abspath(pdf_path).lstrip(os.sep)
+    return os.path.join(PDF_STAMP_DIR, relative + '.json')
+
+
+def markdown_digest(md_path: str) -> str:
+    with open(md_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def pdf_is_current(md_path: str, pdf_path: str, digest: Optional[str] = None) -> bool:
+    """True if pdf_path was rendered from the markdown as it is now.
+
+    The stamp written after each render records the markdown's SHA-256
+    and the PDF's size and mtime, so an edited markdown file or a PDF
+    replaced by something else both count as stale.
+    """
+    try:
+        with open(_stamp_path(pdf_path), 'r') as f:
+            stamp = json.load(f)
+        st = os.stat(pdf_path)
+        digest = digest or markdown_digest(md_path)
+    except (OSError, ValueError):
+        return False
+    return (stamp.get('markdown_sha256') == digest and
+            stamp.get('size') == st.st_size and stamp.get('mtime_ns') == st.st_mtime_ns)
+
+
+def _record(pdf_path: str, digest: str) -> None:
+    st = os.stat(pdf_path)
+    stamp_path = _stamp_path(pdf_path)
+    os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+    tmp_path = f'{stamp_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'markdown_sha256': digest, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}, f)
+    os.replace(tmp_path, stamp_path)
+
+
+def render_pdf(md_path: str, pdf_path: str) -> Dict[str, Any]:
+    """Render md_path to pdf_path unless the existing PDF is current.
+
+    The PDF is written under a temporary name and renamed into place.
+    Returns ``{'pdf': pdf_path, 'rendered': bool}``. Picklable, for
+    process pools.
+    """
+    with open(md_path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if pdf_is_current(md_path, pdf_path, digest):
+        return {'pdf': pdf_path, 'rendered': False}
+
+    from .rca_writer import markdown_to_pdf
+
+    tmp_path = f'{pdf_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        markdown_to_pdf(data.decode('utf-8'), tmp_path)
+        os.replace(tmp_path, pdf_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    _record(pdf_path, digest)
+    return {'pdf': pdf_path, 'rendered': True}
+
+
+def _init_process(base_dir: Optional[str]) -> None:
+    # Markdown and PDF paths are relative to the submitting process's cwd
+    if base_dir:
+        os.chdir(base_dir)
+
+
+class PDFRenderer:
+    """Process pool that renders PDFs off the request path.
+
+    At most one render per PDF path is in flight; submitting the same PDF
+    again returns the pending future. ensure() skips the pool entirely
+    when the PDF is already current. The pool (spawn start method) is
+    created on first use and replaced if a worker dies.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, max_workers: Optional[int] = None):
+        self.base_dir = base_dir
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        """The renderer's process pool, for running other PDF work on it."""
+        with self._lock:
+            return self._get_executor()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers or pdf_workers(),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_process,
+                initargs=(self.base_dir or os.getcwd(),)
+            )
+        return self._executor
+
+    def submit(self, md_path: str, pdf_path: str) -> Future:
+        """Queue a render (a no-op in the worker if the PDF is current)."""
+        with self._lock:
+            future = self._pending.get(pdf_path)
+            if future is not None and not future.done():
+                return future
+            try:
+                future = self._get_executor().submit(render_pdf, md_path, pdf_path)
+            except BrokenExecutor:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+                future = self._get_executor().submit(render_pdf, md_path, pdf_path)
+            self._pending[pdf_path] = future
+        future.add_done_callback(lambda done: self._forget(pdf_path, done))
+        return future
+
+    def _forget(self, pdf_path: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(pdf_path) is future:
+                del self._pending[pdf_path]
+
+    def ensure(self, md_path: str, pdf_path: str) -> Future:
+        """Future for a current PDF, rendering it only if it is stale."""
+        with self._lock:
+            pending = self._pending.get(pdf_path)
+        if pending is None and pdf_is_current(md_path, pdf_path):
+            future: Future = Future()
+            future.set_result({'pdf': pdf_path, 'rendered': False})
+            return future
+        return self.submit(md_path, pdf_path)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
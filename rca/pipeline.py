@@ -0,0 +1,276 @@
+"""Run triage and code analysis once per incident and reuse the result."""
+import hashlib
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from .schema import AnalysisArtifact, Incident, Candidate, RCAData
+from .loaders import CACHE_DIR, get_knowledge_base, load_incident, _file_stamp
+from .correlate import select_top_candidate
+from .scoring import score_candidates
+from .rules import compile_rule_set
+from .analyze import (
+    analyze_code, compute_tat, generate_five_whys,
+    generate_candidate_fixes, get_owners, generate_validations, generate_prevention
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+ANALYSIS_DIR = f'{CACHE_DIR}/analysis'
+
+
+def analysis_key(incident_file: str) -> str:
+    """Key an analysis by incident content, data map state and guideline set."""
+    kb = get_knowledge_base()
+    rules = kb.derive('guidelines', compile_rule_set)
+    digest = hashlib.sha256(Path(incident_file).read_bytes())
+    digest.update(kb.fingerprint().encode())
+    digest.update(rules.version.encode())
+    return digest.hexdigest()[:32]
+
+
+def _suspect_stamp(suspect: Candidate) -> Optional[list]:
+    stamp = _file_stamp(f'repos/{suspect.repo}/{suspect.file}')
+    return list(stamp) if stamp else None
+
+
+def build_rca_data(incident: Incident, suspect: Candidate) -> RCAData:
+    """Analyze the suspect code and assemble the full RCA data."""
+    observations = analyze_code(incident, suspect)
+    return RCAData(
+        incident=incident,
+        suspect=suspect,
+        summary=f"Analysis of {incident.title} - {incident.error_message}",
+        created_at=incident.created_at,
+        resolved_at=incident.resolved_at,
+        tat=compute_tat(incident),
+        impact=incident.impact,
+        whys=generate_five_whys(incident, suspect, observations),
+        observations=observations,
+        diffs=generate_candidate_fixes(incident, suspect, observations),
+        validations=generate_validations(incident, observations),
+        prevention=generate_prevention(incident, observations),
+        owners=get_owners(incident)
+    )
+
+
+def _artifact_path(incident_id: str) -> str:
+    return f'{ANALYSIS_DIR}/{incident_id}.json'
+
+
+def store_analysis(artifact: AnalysisArtifact) -> str:
+    """Write an analysis artifact atomically and return its path."""
+    path = _artifact_path(artifact.rca.incident.id)
+    os.makedirs(ANALYSIS_DIR, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(artifact.model_dump_json())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_artifact(incident_id: str, key: str) -> Optional[AnalysisArtifact]:
+    try:
+        with open(_artifact_path(incident_id), 'r') as f:
+            artifact = AnalysisArtifact.model_validate_json(f.read())
+    except (OSError, ValueError):
+        return None
+    if artifact.key != key or artifact.suspect_stamp != _suspect_stamp(artifact.rca.suspect):
+        return None
+    return artifact
+
+
+def load_analysis(incident_file: str) -> AnalysisArtifact:
+    """Return the analysis for an incident, computing and persisting it on a miss.
+
+    The artifact is reused while the incident file, the data maps and the
+    guidelines are unchanged and the suspect file has not been edited, so a
+    full workflow runs correlation and analysis once.
+    """
+    incident = load_incident(incident_file)
+    key = analysis_key(incident_file)
+    artifact = _read_artifact(incident.id, key)
+    if artifact is not None:
+        return artifact
+
+    candidates = score_candidates(incident)
+    suspect = select_top_candidate(incident, candidates)
+    artifact = AnalysisArtifact(
+        key=key,
+        candidates=candidates,
+        rca=build_rca_data(incident, suspect),
+        suspect_stamp=_suspect_stamp(suspect)
+    )
+    store_analysis(artifact)
+    return artifact
+
+
+def refresh_incident(incident_file: str, artifact: AnalysisArtifact) -> AnalysisArtifact:
+    """Re-key an artifact after the incident file itself was updated.
+
+    Used after the final RCA stamps ``resolved_at``: only the timeline
+    fields change, so the stored analysis is carried over instead of being
+    recomputed.
+    """
+    incident = load_incident(incident_file)
+    rca = artifact.rca.model_copy(update={
+        'incident': incident,
+        'resolved_at': incident.resolved_at,
+        'tat': compute_tat(incident),
+    })
+    refreshed = artifact.model_copy(update={'key': analysis_key(incident_file), 'rca': rca})
+    store_analysis(refreshed)
+    return refreshed
+
+
+# Pipeline stages. Each returns a JSON-serializable dict so the same stage
+# can back a CLI subcommand, a demo DAG node or an API job.
+
+def run_triage(incident_file: str) -> Dict[str, Any]:
+    """Triage an incident (persisting the analysis) and return ranked candidates."""
+    analysis = load_analysis(incident_file)
+    return {
+        'incident': analysis.rca.incident.id,
+        'candidates': [c.model_dump() for c in analysis.candidates],
+        'suspect': analysis.rca.suspect.model_dump(),
+    }
+
+
+def run_initial_rca(incident_file: str, pdf: bool = True) -> Dict[str, Any]:
+    """Write the initial RCA markdown (and PDF unless pdf=False)."""
+    from .rca_writer import export_rca_documents
+
+    analysis = load_analysis(incident_file)
+    result = export_rca_documents(analysis.rca, pdf=pdf)
+    return {'markdown': result['markdown'], 'pdf': result['pdf']}
+
+
+def run_final_rca(incident_file: str, fix_commit: Optional[str] = None, pdf: bool = True) -> Dict[str, Any]:
+    """Write the final RCA for a fix commit and mark the incident resolved.
+
+    Without fix_commit, the head of the incident's fix branch is used
+    (falling back to HEAD if no fix was applied).
+    """
+    from .rca_writer import export_final_rca_documents
+    from .finalizer import finalize_rca_data, update_incident_resolved_time
+    from .gitutils import get_current_commit_hash, get_fix_commit
+
+    analysis = load_analysis(incident_file)
+    fix_commit = (fix_commit or get_fix_commit(analysis.rca.incident.id)
+                  or get_current_commit_hash())
+    rca_data = analysis.rca
+    fix_info = finalize_rca_data(rca_data, fix_commit)
+    result = export_final_rca_documents(
+        rca_data,
+        fix_info['fix_commit'],
+        fix_info['files_changed'],
+        fix_info['fix_summary'],
+        pdf=pdf
+    )
+
+    # Update incident as resolved and carry the analysis over to the new incident state
+    update_incident_resolved_time(incident_file)
+    refresh_incident(incident_file, analysis)
+    return {'markdown': result['markdown'], 'pdf': result['pdf'], 'fix_commit': fix_commit}
+
+
+def run_draft_pr(incident_file: str) -> Dict[str, Any]:
+    """Write the PR draft for an incident."""
+    from .pr_draft import generate_pr_draft
+
+    analysis = load_analysis(incident_file)
+    incident = analysis.rca.incident
+    rca_data = analysis.rca.model_copy(update={'summary': f"Fix for {incident.title}"})
+    result = generate_pr_draft(rca_data)
+    return {'path': result['path']}
+
+
+def run_ticket(incident_file: str, team: str = "FTS") -> Dict[str, Any]:
+    """Create a Linear ticket (real or mock) for an incident."""
+    from .linear_client import create_ticket_from_rca
+
+    analysis = load_analysis(incident_file)
+    incident = analysis.rca.incident
+    rca_data = analysis.rca.model_copy(update={'summary': f"RCA for {incident.title}"})
+    return create_ticket_from_rca(incident.id, rca_data, team)
+
+
+def run_apply_fix(incident_file: str) -> Dict[str, Any]:
+    """Commit the fixes to the incident's fix branch and return the fix commit.
+
+    'changed' is False when nothing needed fixing; fix_commit is then the
+    branch's base commit.
+    """
+    from .gitutils import apply_fix_commit, fix_branch, get_fix_base
+
+    incident = load_incident(incident_file)
+    fix_commit = apply_fix_commit(incident.id)
+    base = get_fix_base(incident.id)
+    return {'fix_commit': fix_commit, 'branch': fix_branch(incident.id), 'base': base,
+            'changed': base is not None and fix_commit != base}
+
+
+def run_compare(incident_file: str, fix_commit: Optional[str] = None,
+                context: Optional[int] = None) -> Dict[str, Any]:
+    """Write the before/after comparison document for an incident.
+
+    context is the number of unchanged lines around each diff hunk.
+    """
+    from .comparison_doc import generate_comparison_doc
+    from .diffing import DEFAULT_CONTEXT
+    from .gitutils import get_fix_commit
+
+    analysis = load_analysis(incident_file)
+    incident_id = analysis.rca.incident.id
+    suspect = analysis.rca.suspect
+    result = generate_comparison_doc(
+        incident_id,
+        suspect.repo,
+        suspect.file,
+        fix_commit or get_fix_commit(incident_id) or "fix_commit_hash",
+        context=DEFAULT_CONTEXT if context is None else context
+    )
+    return {'path': result['path'], 'lines_added': result['lines_added'],
+            'lines_removed': result['lines_removed']}
+
+
+def demo_graph(incident_file: str) -> list:
+    """Demo pipeline as a dependency graph.
+
+    Initial RCA, PR draft and ticket only need the persisted analysis, so
+    they run together; PDFs render in worker processes from the saved
+    markdown. apply_fix commits in its own worktree, so it runs alongside
+    the document writers; final_rca waits for them, since it rewrites the
+    incident file they read.
+    """
+    from .dag import Node
+    from .gitutils import setup_git_history
+    from .rca_writer import render_pdf_file
+
+    return [
+        Node('init', setup_git_history),
+        Node('triage', run_triage, deps=('init',), args=lambda r: (incident_file,)),
+        Node('initial_rca', run_initial_rca, deps=('triage',), args=lambda r: (incident_file, False)),
+        Node('initial_rca_pdf', render_pdf_file, deps=('initial_rca',), kind='process',
+             args=lambda r: (r['initial_rca']['markdown'], r['initial_rca']['pdf'])),
+        Node('draft_pr', run_draft_pr, deps=('triage',), args=lambda r: (incident_file,)),
+        Node('ticket', run_ticket, deps=('triage',), args=lambda r: (incident_file, "FTS")),
+        Node('apply_fix', run_apply_fix, deps=('triage',), args=lambda r: (incident_file,)),
+        # final_rca rewrites the incident file the document writers read
+        Node('final_rca', run_final_rca, deps=('apply_fix', 'initial_rca', 'draft_pr', 'ticket'),
+             args=lambda r: (incident_file, r['apply_fix']['fix_commit'], False)),
+        Node('final_rca_pdf', render_pdf_file, deps=('final_rca',), kind='process',
+             args=lambda r: (r['final_rca']['markdown'], r['final_rca']['pdf'])),
+        # Runs after final_rca, which rewrites the incident file
+        Node('compare', run_compare, deps=('final_rca',),
+             args=lambda r: (incident_file, r['apply_fix']['fix_commit'])),
+    ]
+
+
+def run_demo(incident_file: str,
+             on_event: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+             executor: Optional['Executor'] = None) -> Dict[str, Any]:
+    """Run the demo graph; see dag.run_dag for the result, event format and executor."""
+    from .dag import run_dag
+
+    return run_dag(demo_graph(incident_file), on_event=on_event, executor=executor)
@@ -1,22 +1,19 @@
 """Build PR Markdown with proposed fixes."""
-from jinja2 import Environment, FileSystemLoader
 from .schema import RCAData
+from .templating import render_to_file
 
 
 def generate_pr_draft(rca_data: RCAData, output_dir: str = "out") -> dict:
     """Generate PR draft markdown."""
-    env = Environment(
-        loader=FileSystemLoader('docs/templates'),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
-    
-    template = env.get_template('pr_draft.md.j2')
-    
     # Generate risks based on the fixes
     risks = generate_risks(rca_data)
     
-    content = template.render(
+    # Stream to file
+    incident_id = rca_data.incident.id
+    output_path = f"{output_dir}/{incident_id}_pr_draft.md"
+    render_to_file(
+        'pr_draft.md.j2',
+        output_path,
         incident=rca_data.incident,
         summary=rca_data.summary,
         diffs=rca_data.diffs,
@@ -24,18 +21,8 @@ def generate_pr_draft(rca_data: RCAData, output_dir: str = "out") -> dict:
         validations=rca_data.validations
     )
     
-    # Save to file
-    incident_id = rca_data.incident.id
-    output_path = f"{output_dir}/{incident_id}_pr_draft.md"
-    
-    import os
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write(content)
-    
     return {
-        'path': output_path,
-        'content': content
+        'path': output_path
     }
 
 
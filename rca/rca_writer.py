@@ -1,29 +1,31 @@
 """Render Jinja templates into Markdown and export PDFs."""
 import os
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Preformatted, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from .artifacts import write_text_artifact
+from .pdfs import render_pdf
 from .schema import RCAData
+from .templating import get_jinja_env, render_to_file
+
+# Lines per Preformatted flowable in code/diff blocks (about 2/3 of a page)
+CODE_CHUNK_LINES = 50
+# Courier 7.5pt fits about 104 characters across the default text width
+CODE_LINE_CHARS = 100
 
 
 def setup_jinja_env() -> Environment:
-    """Set up Jinja2 environment."""
-    return Environment(
-        loader=FileSystemLoader('docs/templates'),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
+    """Return the shared Jinja2 environment."""
+    return get_jinja_env()
 
 
-def render_initial_rca(rca_data: RCAData) -> str:
-    """Render initial RCA markdown."""
-    env = setup_jinja_env()
-    template = env.get_template('rca_initial.md.j2')
-    
-    return template.render(
+def initial_rca_context(rca_data: RCAData) -> dict:
+    """Template variables for rca_initial.md.j2."""
+    return dict(
         incident=rca_data.incident,
         summary=rca_data.summary,
         created_at=rca_data.created_at,
@@ -40,12 +42,9 @@ def render_initial_rca(rca_data: RCAData) -> str:
     )
 
 
-def render_final_rca(rca_data: RCAData, fix_commit: str, files_changed: str, fix_summary: str) -> str:
-    """Render final RCA markdown."""
-    env = setup_jinja_env()
-    template = env.get_template('rca_final.md.j2')
-    
-    return template.render(
+def final_rca_context(rca_data: RCAData, fix_commit: str, files_changed: str, fix_summary: str) -> dict:
+    """Template variables for rca_final.md.j2."""
+    return dict(
         incident=rca_data.incident,
         fix_commit=fix_commit,
         files_changed=files_changed,
@@ -59,23 +58,32 @@ def render_final_rca(rca_data: RCAData, fix_commit: str, files_changed: str, fix
     )
 
 
-def save_markdown(content: str, output_path: str) -> None:
-    """Save markdown content to file."""
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write(content)
+def render_initial_rca(rca_data: RCAData) -> str:
+    """Render initial RCA markdown."""
+    env = setup_jinja_env()
+    template = env.get_template('rca_initial.md.j2')
+    
+    return template.render(**initial_rca_context(rca_data))
 
 
-def markdown_to_pdf(markdown_content: str, pdf_path: str) -> None:
-    """Convert markdown to PDF using reportlab."""
-    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+def render_final_rca(rca_data: RCAData, fix_commit: str, files_changed: str, fix_summary: str) -> str:
+    """Render final RCA markdown."""
+    env = setup_jinja_env()
+    template = env.get_template('rca_final.md.j2')
     
-    # Create PDF document
-    doc = SimpleDocTemplate(pdf_path, pagesize=letter)
+    return template.render(**final_rca_context(rca_data, fix_commit, files_changed, fix_summary))
+
+
+def save_markdown(content: str, output_path: str) -> None:
+    """Save markdown content to file (plus its gzip copy for downloads)."""
+    write_text_artifact(output_path, content)
+
+
+@lru_cache(maxsize=None)
+def pdf_styles():
+    """Sample stylesheet plus the title/heading styles, built once per process."""
     styles = getSampleStyleSheet()
-    story = []
     
-    # Custom styles
     title_style = ParagraphStyle(
         'CustomTitle',
         parent=styles['Heading1'],
@@ -92,10 +100,63 @@ def markdown_to_pdf(markdown_content: str, pdf_path: str) -> None:
         textColor='#34495e'
     )
     
+    code_style = ParagraphStyle(
+        'CodeBlock',
+        parent=styles['Code'],
+        fontSize=7.5,
+        leading=9,
+        leftIndent=0
+    )
+    return styles, title_style, heading_style, code_style
+
+
+def code_block_flowables(lines: list, style: ParagraphStyle) -> list:
+    """Fenced code/diff block as Preformatted chunks of CODE_CHUNK_LINES.
+
+    One flowable per line made big diffs slow and memory hungry, while one
+    flowable per block makes every page split re-measure the whole rest of
+    the block. Fixed-size chunks keep layout linear in the number of lines;
+    a chunk that straddles a page is split by Preformatted itself. Lines
+    longer than the text width wrap instead of running off the page.
+    """
+    flowables = [Spacer(1, 4)]
+    for start in range(0, len(lines), CODE_CHUNK_LINES):
+        flowables.append(Preformatted(
+            '\n'.join(lines[start:start + CODE_CHUNK_LINES]),
+            style,
+            maxLineLength=CODE_LINE_CHARS,
+            newLineChars=''
+        ))
+    flowables.append(Spacer(1, 4))
+    return flowables
+
+
+def markdown_to_pdf(markdown_content: str, pdf_path: str) -> None:
+    """Convert markdown to PDF using reportlab."""
+    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+    
+    # Create PDF document
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter)
+    styles, title_style, heading_style, code_style = pdf_styles()
+    story = []
+    
     # Parse markdown content (simple implementation)
     lines = markdown_content.split('\n')
+    code_lines = None
     
     for line in lines:
+        if line.lstrip().startswith('```'):
+            # Fence opens or closes a code/diff block
+            if code_lines is None:
+                code_lines = []
+            else:
+                story.extend(code_block_flowables(code_lines, code_style))
+                code_lines = None
+            continue
+        if code_lines is not None:
+            code_lines.append(line.rstrip())
+            continue
+        
         line = line.strip()
         if not line:
             story.append(Spacer(1, 6))
@@ -124,50 +185,62 @@ def markdown_to_pdf(markdown_content: str, pdf_path: str) -> None:
             if line:
                 story.append(Paragraph(line, styles['Normal']))
     
+    if code_lines:
+        # Unterminated fence: keep the code rather than dropping it
+        story.extend(code_block_flowables(code_lines, code_style))
+    
     # Build PDF
     doc.build(story)
 
 
-def export_rca_documents(rca_data: RCAData, output_dir: str = "out") -> dict:
-    """Export RCA documents in multiple formats."""
+def render_pdf_file(md_path: str, pdf_path: str) -> str:
+    """Render a saved markdown file to PDF (picklable for process pools).
+
+    Skipped when the PDF was already rendered from identical markdown
+    (see pdfs.render_pdf).
+    """
+    return render_pdf(md_path, pdf_path)['pdf']
+
+
+def export_rca_documents(rca_data: RCAData, output_dir: str = "out", pdf: bool = True) -> dict:
+    """Export RCA documents in multiple formats.
+
+    With pdf=False only the markdown is written; the caller renders the PDF
+    later (e.g. in a process pool) with render_pdf_file.
+    """
     incident_id = rca_data.incident.id
     
-    # Render markdown
-    markdown_content = render_initial_rca(rca_data)
-    
     # File paths
     md_path = f"{output_dir}/{incident_id}_initial_rca.md"
     pdf_path = f"{output_dir}/{incident_id}_initial_rca.pdf"
     
-    # Save files
-    save_markdown(markdown_content, md_path)
-    markdown_to_pdf(markdown_content, pdf_path)
+    # Stream markdown to disk, then render the PDF from the saved file
+    render_to_file('rca_initial.md.j2', md_path, **initial_rca_context(rca_data))
+    if pdf:
+        render_pdf_file(md_path, pdf_path)
     
     return {
         'markdown': md_path,
-        'pdf': pdf_path,
-        'content': markdown_content
+        'pdf': pdf_path
     }
 
 
 def export_final_rca_documents(rca_data: RCAData, fix_commit: str, files_changed: str, 
-                              fix_summary: str, output_dir: str = "out") -> dict:
-    """Export final RCA documents."""
+                              fix_summary: str, output_dir: str = "out", pdf: bool = True) -> dict:
+    """Export final RCA documents (markdown only when pdf=False)."""
     incident_id = rca_data.incident.id
     
-    # Render markdown
-    markdown_content = render_final_rca(rca_data, fix_commit, files_changed, fix_summary)
-    
     # File paths
     md_path = f"{output_dir}/{incident_id}_final_rca.md"
     pdf_path = f"{output_dir}/{incident_id}_final_rca.pdf"
     
-    # Save files
-    save_markdown(markdown_content, md_path)
-    markdown_to_pdf(markdown_content, pdf_path)
+    # Stream markdown to disk, then render the PDF from the saved file
+    render_to_file('rca_final.md.j2', md_path,
+                   **final_rca_context(rca_data, fix_commit, files_changed, fix_summary))
+    if pdf:
+        render_pdf_file(md_path, pdf_path)
     
     return {
         'markdown': md_path,
-        'pdf': pdf_path,
-        'content': markdown_content
+        'pdf': pdf_path
     }
@@ -0,0 +1,140 @@
+"""Compile code guidelines into a rule set with cached per-file results."""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from .schema import Incident, Observation
+from .spans import SUPPORTED_LANGUAGES, parse_spans
+
+RESULT_CACHE_SIZE = 1024
+
+_BARE_EXCEPT = re.compile(r'except\s*:')
+
+
+def _gateway_exceeded(code: str, language: str, incident: Incident) -> bool:
+    return "gateway exceeded 5s" in incident.error_message
+
+
+def _missing_log_context(code: str, language: str, incident: Incident) -> bool:
+    # Error handling that throws without any context fields nearby
+    return "throw" in code and not any(field in code for field in ["request_id", "user_id", "amount"])
+
+
+def _function_lines_gt_50(code: str, language: str, incident: Incident) -> bool:
+    if language in SUPPORTED_LANGUAGES:
+        longest = parse_spans(code, language).longest()
+        return longest is not None and longest.length > 50
+    # No span parser for this language: fall back to counting file lines
+    return len(code.split('\n')) > 50
+
+
+def _bare_except(code: str, language: str, incident: Incident) -> bool:
+    return _BARE_EXCEPT.search(code) is not None
+
+
+# pattern -> (check, languages it applies to or None for all, depends on incident)
+SPECIAL_RULES: Dict[str, Tuple[Callable[[str, str, Incident], bool], Optional[FrozenSet[str]], bool]] = {
+    "gateway exceeded 5s": (_gateway_exceeded, None, True),
+    "missing_log_context": (_missing_log_context, frozenset({'typescript', 'javascript', 'java'}), False),
+    "function_lines_gt_50": (_function_lines_gt_50, None, False),
+    "bare except": (_bare_except, frozenset({'python'}), False),
+}
+
+
+def _never(code: str, language: str, incident: Incident) -> bool:
+    return False
+
+
+class Rule:
+    """One compiled guideline."""
+
+    def __init__(self, guideline: Dict[str, str]):
+        self.pattern = guideline['pattern']
+        self.kind = guideline['type']
+        self.explanation = guideline['explanation']
+
+        special = SPECIAL_RULES.get(self.pattern)
+        if special:
+            self.check, self.languages, self.uses_incident = special
+        else:
+            try:
+                regex = re.compile(self.pattern)
+                self.check = lambda code, language, incident: regex.search(code) is not None
+            except re.error:
+                self.check = _never
+            self.languages = None
+            self.uses_incident = False
+
+        # An optional `languages` column (e.g. "python;typescript") overrides the default
+        languages = (guideline.get('languages') or '').strip()
+        if languages:
+            self.languages = frozenset(l.strip() for l in languages.split(';') if l.strip())
+
+    def applies_to(self, language: str) -> bool:
+        return self.languages is None or language in self.languages
+
+    def observation(self) -> Observation:
+        return Observation(kind=self.kind, note=self.explanation, rule=self.pattern)
+
+
+class RuleSet:
+    """Guidelines compiled once, with code-only results cached per file.
+
+    Rules that only look at the code are evaluated once per (file content
+    hash, rule set version, language) and the hit list is kept in a bounded
+    LRU. Rules that depend on the incident are evaluated on every call.
+    """
+
+    def __init__(self, guidelines: List[Dict[str, str]]):
+        self.rules = [Rule(g) for g in guidelines]
+        digest = hashlib.sha1()
+        for g in guidelines:
+            digest.update(repr(sorted(g.items())).encode())
+        self.version = digest.hexdigest()[:16]
+
+    def evaluate(self, code: str, language: str, incident: Incident) -> List[Observation]:
+        """Return observations for every rule that matches, in guideline order."""
+        content_hash = hashlib.sha1(code.encode()).hexdigest()
+        key = (content_hash, self.version, language)
+        code_hits = _result_cache_get(key)
+        if code_hits is None:
+            code_hits = frozenset(
+                i for i, rule in enumerate(self.rules)
+                if not rule.uses_incident and rule.applies_to(language) and rule.check(code, language, incident)
+            )
+            _result_cache_put(key, code_hits)
+
+        observations = []
+        for i, rule in enumerate(self.rules):
+            if rule.uses_incident:
+                matched = rule.applies_to(language) and rule.check(code, language, incident)
+            else:
+                matched = i in code_hits
+            if matched:
+                observations.append(rule.observation())
+        return observations
+
+
+_result_cache: "OrderedDict[Tuple[str, str, str], FrozenSet[int]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _result_cache_get(key: Tuple[str, str, str]) -> Optional[FrozenSet[int]]:
+    with _result_cache_lock:
+        hits = _result_cache.get(key)
+        if hits is not None:
+            _result_cache.move_to_end(key)
+        return hits
+
+
+def _result_cache_put(key: Tuple[str, str, str], hits: FrozenSet[int]) -> None:
+    with _result_cache_lock:
+        _result_cache[key] = hits
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def compile_rule_set(guidelines: List[Dict[str, str]]) -> RuleSet:
+    """Build a RuleSet from guideline rows (KnowledgeBase.derive builder)."""
+    return RuleSet(guidelines)
@@ -21,12 +21,26 @@ class Incident(BaseModel):
     error_message: str
 
 
+class FunctionSpan(BaseModel):
+    """Line span of a function or method in a source file (1-based, inclusive)."""
+    name: str
+    line_start: int
+    line_end: int
+
+    @property
+    def length(self) -> int:
+        return self.line_end - self.line_start + 1
+
+
 class Candidate(BaseModel):
     """Code candidate for RCA analysis."""
     repo: str
     file: str
     score: int
     reasons: List[str]
+    function: Optional[str] = None
+    line_start: Optional[int] = None
+    line_end: Optional[int] = None
 
 
 class Observation(BaseModel):
@@ -53,6 +67,14 @@ class RCAData(BaseModel):
     owners: str
 
 
+class AnalysisArtifact(BaseModel):
+    """Persisted result of triage + analysis for one incident."""
+    key: str
+    candidates: List[Candidate]
+    rca: RCAData
+    suspect_stamp: Optional[List[int]] = None
+
+
 class TicketData(BaseModel):
     """Linear ticket data structure."""
     title: str
@@ -0,0 +1,72 @@
+"""Aho-Corasick matcher for error index signatures."""
+from collections import deque
+from typing import Dict, List
+
+
+class SignatureMatcher:
+    """Compiled automaton that finds every error index signature in one pass.
+
+    Matching is plain substring containment, the same as
+    ``signature in message``, so results are identical to testing each row
+    in turn. Rows come back in error index order.
+    """
+
+    def __init__(self, rows: List[Dict[str, str]]):
+        self.rows = rows
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        # An empty signature is contained in every message
+        self._always: List[int] = []
+
+        for i, row in enumerate(rows):
+            signature = row.get('signature') or ''
+            if not signature:
+                self._always.append(i)
+                continue
+            state = 0
+            for ch in signature:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state].append(i)
+
+        # Breadth-first pass to fill failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> List[int]:
+        """Return indexes of the rows whose signature occurs in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(self._always)
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return sorted(found)
+
+    def match_rows(self, text: str) -> List[Dict[str, str]]:
+        """Return the error index rows whose signature occurs in text."""
+        return [self.rows[i] for i in self.search(text)]
+
+
+def build_signature_matcher(rows: List[Dict[str, str]]) -> SignatureMatcher:
+    """Build a matcher from error index rows (KnowledgeBase.derive builder)."""
+    return SignatureMatcher(rows)
@@ -0,0 +1,272 @@
+"""Index function/method line spans in repository source files."""
+import ast
+import bisect
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from .schema import FunctionSpan
+from .loaders import get_file_extension, load_repo_file, _file_stamp
+
+SPAN_CACHE_SIZE = 512
+SUPPORTED_LANGUAGES = ('python', 'typescript', 'javascript')
+
+_TS_KEYWORDS = {'if', 'for', 'while', 'switch', 'catch', 'function', 'return', 'with'}
+_TS_FUNCTION = re.compile(
+    r'\b(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)\s*(?:<[^>(]*>)?\s*\('
+)
+_TS_ARROW = re.compile(
+    r'\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*(?::[^=;]+)?=\s*(?:async\s+)?'
+    r'(?:function\b[^(]*\(|\([^;]*?\)\s*(?::\s*[^=;{]+)?=>|[A-Za-z_$][\w$]*\s*=>)'
+)
+_TS_CLASS = re.compile(r'\bclass\s+([A-Za-z_$][\w$]*)[^{;]*\{')
+_TS_METHOD = re.compile(
+    r'^[ \t]*(?:(?:public|private|protected|static|async|readonly|override|get|set)\s+)*'
+    r'([A-Za-z_$][\w$]*)\s*(?:<[^>(]*>)?\s*\([^;{]*?\)\s*(?::\s*[^;{=]+)?\{',
+    re.MULTILINE
+)
+
+
+class FileSpans:
+    """Function spans of one file with O(1) lookups by name and by line."""
+
+    def __init__(self, spans: List[FunctionSpan], line_count: int):
+        self.spans = sorted(spans, key=lambda s: (s.line_start, -s.line_end))
+        self.line_count = line_count
+        self._by_name: Dict[str, FunctionSpan] = {}
+        for span in self.spans:
+            self._by_name.setdefault(span.name, span)
+            self._by_name.setdefault(span.name.rsplit('.', 1)[-1], span)
+
+        # line -> innermost enclosing span; outer spans are written first
+        self._line_owner: List[Optional[FunctionSpan]] = [None] * (line_count + 2)
+        for span in self.spans:
+            for line in range(span.line_start, min(span.line_end, line_count) + 1):
+                self._line_owner[line] = span
+
+    def find(self, name: str) -> Optional[FunctionSpan]:
+        """Return the span for a function or `Class.method` name."""
+        return self._by_name.get(name)
+
+    def enclosing(self, line: int) -> Optional[FunctionSpan]:
+        """Return the innermost function containing a 1-based line number."""
+        if 0 < line < len(self._line_owner):
+            return self._line_owner[line]
+        return None
+
+    def longest(self) -> Optional[FunctionSpan]:
+        return max(self.spans, key=lambda s: s.length, default=None)
+
+
+def _python_spans(code: str) -> List[FunctionSpan]:
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return []
+
+    spans = []
+
+    def visit(node, prefix):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = f"{prefix}{child.name}"
+                spans.append(FunctionSpan(name=name, line_start=child.lineno, line_end=child.end_lineno))
+                visit(child, f"{name}.")
+            elif isinstance(child, ast.ClassDef):
+                visit(child, f"{prefix}{child.name}.")
+            else:
+                visit(child, prefix)
+
+    visit(tree, '')
+    return spans
+
+
+def _match_brackets(code: str) -> Dict[int, int]:
+    """Map each opening bracket offset to its closing offset.
+
+    Skips string literals, template literals and comments, which is enough
+    for locating function bodies; regex literals are not recognised.
+    """
+    pairs: Dict[int, int] = {}
+    stack: List[Tuple[str, int]] = []
+    closers = {')': '(', '}': '{', ']': '['}
+    i, n = 0, len(code)
+    while i < n:
+        ch = code[i]
+        if ch in '"\'`':
+            i += 1
+            while i < n and code[i] != ch:
+                i += 2 if code[i] == '\\' else 1
+        elif ch == '/' and code.startswith('//', i):
+            newline = code.find('\n', i)
+            i = n if newline == -1 else newline
+        elif ch == '/' and code.startswith('/*', i):
+            end = code.find('*/', i + 2)
+            i = n if end == -1 else end + 1
+        elif ch in '({[':
+            stack.append((ch, i))
+        elif ch in closers:
+            while stack:
+                opener, start = stack.pop()
+                if opener == closers[ch]:
+                    pairs[start] = i
+                    break
+        i += 1
+    return pairs
+
+
+def _typescript_spans(code: str) -> List[FunctionSpan]:
+    pairs = _match_brackets(code)
+    line_starts = [0] + [m.end() for m in re.finditer('\n', code)]
+
+    def line_of(offset: int) -> int:
+        return bisect.bisect_right(line_starts, offset)
+
+    def body_end(match_end: int) -> Optional[int]:
+        if code[match_end - 1] == '(':
+            # Skip the parameter list, then take the brace-delimited body
+            close = pairs.get(match_end - 1)
+            brace = code.find('{', close) if close is not None else -1
+            return pairs.get(brace) if brace != -1 else None
+        # Arrow function: block body or expression body
+        pos = match_end
+        while pos < len(code) and code[pos] in ' \t\r\n':
+            pos += 1
+        if pos < len(code) and code[pos] == '{':
+            return pairs.get(pos)
+        end = code.find(';', pos)
+        return end if end != -1 else len(code) - 1
+
+    classes = []
+    for match in _TS_CLASS.finditer(code):
+        end = pairs.get(match.end() - 1)
+        if end is not None:
+            classes.append((match.end() - 1, end, match.group(1)))
+
+    def class_of(offset: int) -> Optional[str]:
+        owner = None
+        for start, end, name in classes:
+            if start < offset < end:
+                owner = name
+        return owner
+
+    spans = []
+    seen = set()
+    for pattern in (_TS_FUNCTION, _TS_ARROW):
+        for match in pattern.finditer(code):
+            end = body_end(match.end())
+            if end is None or match.start() in seen:
+                continue
+            seen.add(match.start())
+            spans.append(FunctionSpan(name=match.group(1), line_start=line_of(match.start()),
+                                      line_end=line_of(end)))
+
+    for match in _TS_METHOD.finditer(code):
+        name = match.group(1)
+        owner = class_of(match.start(1))
+        if name in _TS_KEYWORDS or owner is None:
+            continue
+        end = pairs.get(match.end() - 1)
+        if end is None:
+            continue
+        spans.append(FunctionSpan(name=f"{owner}.{name}", line_start=line_of(match.start(1)),
+                                  line_end=line_of(end)))
+    return spans
+
+
+_parse_cache: "OrderedDict[Tuple[str, str], FileSpans]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def parse_spans(code: str, language: str) -> FileSpans:
+    """Return the function spans of source code, cached by content hash."""
+    key = (hashlib.sha1(code.encode()).hexdigest(), language)
+    with _parse_cache_lock:
+        cached = _parse_cache.get(key)
+        if cached is not None:
+            _parse_cache.move_to_end(key)
+            return cached
+
+    if language == 'python':
+        spans = _python_spans(code)
+    elif language in ('typescript', 'javascript'):
+        spans = _typescript_spans(code)
+    else:
+        spans = []
+    result = FileSpans(spans, code.count('\n') + 1)
+
+    with _parse_cache_lock:
+        _parse_cache[key] = result
+        while len(_parse_cache) > SPAN_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return result
+
+
+class SpanIndex:
+    """Function spans for every supported file in one repository.
+
+    Files are parsed lazily, the first time a lookup touches them; later
+    lookups re-stat only that file and reparse it if its mtime or size
+    changed. refresh() indexes the whole repo up front.
+    """
+
+    def __init__(self, repo: str):
+        self.repo = repo
+        self._files: Dict[str, Tuple[Tuple[int, int], FileSpans]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Walk the repository, reindexing changed files and dropping deleted ones."""
+        root = f'repos/{self.repo}'
+        found = set()
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                file_path = os.path.relpath(os.path.join(dirpath, filename), root)
+                if get_file_extension(file_path) in SUPPORTED_LANGUAGES:
+                    found.add(file_path)
+                    self.file_spans(file_path)
+        with self._lock:
+            for file_path in set(self._files) - found:
+                del self._files[file_path]
+
+    def file_spans(self, file_path: str) -> Optional[FileSpans]:
+        """Return spans for a file, reparsing it only if it changed."""
+        stamp = _file_stamp(f'repos/{self.repo}/{file_path}')
+        if stamp is None:
+            with self._lock:
+                self._files.pop(file_path, None)
+            return None
+        with self._lock:
+            cached = self._files.get(file_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        code = load_repo_file(self.repo, file_path)
+        if code is None:
+            return None
+        spans = parse_spans(code, get_file_extension(file_path))
+        with self._lock:
+            self._files[file_path] = (stamp, spans)
+        return spans
+
+    def find(self, file_path: str, function: str) -> Optional[FunctionSpan]:
+        spans = self.file_spans(file_path)
+        return spans.find(function) if spans else None
+
+    def enclosing(self, file_path: str, line: int) -> Optional[FunctionSpan]:
+        spans = self.file_spans(file_path)
+        return spans.enclosing(line) if spans else None
+
+
+_span_indexes: Dict[str, SpanIndex] = {}
+_span_indexes_lock = threading.Lock()
+
+
+def get_span_index(repo: str) -> SpanIndex:
+    """Return the process-wide span index for a repository."""
+    with _span_indexes_lock:
+        index = _span_indexes.get(repo)
+        if index is None:
+            index = _span_indexes[repo] = SpanIndex(repo)
+        return index
@@ -0,0 +1,53 @@
+"""Shared Jinja environment for the markdown templates."""
+import logging
+import os
+import threading
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from .artifacts import PathLike, write_artifact_chunks
+from .loaders import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = 'docs/templates'
+BYTECODE_DIR = f'{CACHE_DIR}/jinja'
+
+_env = None
+_env_lock = threading.Lock()
+
+
+def _bytecode_cache():
+    try:
+        os.makedirs(BYTECODE_DIR, exist_ok=True)
+    except OSError as e:
+        logger.info(f"Template bytecode cache disabled: {e}")
+        return None
+    return FileSystemBytecodeCache(BYTECODE_DIR)
+
+
+def get_jinja_env() -> Environment:
+    """Return the process-wide template environment.
+
+    Compiled templates are kept in the environment's cache and recompiled
+    only when the template file changes (Jinja's auto_reload check), so a
+    long-lived process renders without reparsing. Compiled bytecode is
+    also stored in .rca_cache/jinja, keyed by template source, so a fresh
+    CLI process loads it instead of compiling.
+    """
+    global _env
+    with _env_lock:
+        if _env is None:
+            _env = Environment(
+                loader=FileSystemLoader(TEMPLATE_DIR),
+                bytecode_cache=_bytecode_cache(),
+                auto_reload=True,
+                trim_blocks=True,
+                lstrip_blocks=True
+            )
+        return _env
+
+
+def render_to_file(template_name: str, output_path: PathLike, **context) -> None:
+    """Stream a template into output_path (and its gzip copy) without
+    building the whole document in memory."""
+    template = get_jinja_env().get_template(template_name)
+    write_artifact_chunks(output_path, template.generate(**context))
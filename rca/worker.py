@@ -0,0 +1,192 @@
+"""Long-lived worker that runs CLI pipeline commands over a Unix socket.
+
+Protocol: one JSON object per line in each direction. A request is
+``{"command": "triage", "args": ["incidents/TCK-1001.json"]}``; the reply
+mirrors a CLI subprocess run: ``success``, ``stdout``, ``stderr``,
+``returncode`` plus ``elapsed_ms``. ``{"command": "ping"}`` reports the
+worker's pid and working directory.
+"""
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .loaders import CACHE_DIR
+
+WORKER_COMMANDS = ('triage', 'rca', 'draft-pr', 'ticket', 'compare')
+DEFAULT_TIMEOUT = 60.0
+
+
+def default_socket_path(base_dir: str = '.') -> str:
+    """Socket path from RCA_WORKER_SOCKET, else <base_dir>/.rca_cache/worker.sock."""
+    return os.getenv('RCA_WORKER_SOCKET') or os.path.join(base_dir, CACHE_DIR, 'worker.sock')
+
+
+def warm_up() -> None:
+    """Load data maps, compiled rules, span indexes and templates up front."""
+    from .loaders import build_previous_releases, get_knowledge_base
+    from .rules import compile_rule_set
+    from .signatures import build_signature_matcher
+    from .spans import get_span_index
+    from .templating import get_jinja_env
+    from .gitutils import get_git_reader
+    # Import the writers and Linear client once instead of on the first job
+    from . import comparison_doc, finalizer, linear_client, pr_draft, rca_writer  # noqa: F401
+
+    kb = get_knowledge_base()
+    for name in kb.SOURCES:
+        kb.get(name)
+    kb.derive('guidelines', compile_rule_set)
+    kb.derive('error_index', build_signature_matcher)
+    kb.derive('releases', build_previous_releases)
+    if os.path.isdir('repos'):
+        for repo in sorted(os.listdir('repos')):
+            get_span_index(repo).refresh()
+
+    # Start the cat-file pipe used by final RCA and compare
+    get_git_reader().resolve('HEAD')
+
+    env = get_jinja_env()
+    for name in env.list_templates(extensions=['j2']):
+        env.get_template(name)
+    _get_parser()
+
+
+_parser = None
+
+
+def _get_parser():
+    # argparse parsers are not modified by parse_args, so one is shared
+    global _parser
+    if _parser is None:
+        from .cli import build_parser
+        _parser = build_parser()
+    return _parser
+
+
+def execute(command: str, args: List[str]) -> Dict[str, Any]:
+    """Run one CLI command in-process, capturing what it prints."""
+    from rich.console import Console
+    from . import cli
+
+    started = time.perf_counter()
+    stdout = io.StringIO()
+    stderr = ''
+    with cli.console.bind(Console(file=stdout)):
+        try:
+            parsed = _get_parser().parse_args([command] + list(args))
+            parsed.func(parsed)
+            returncode = 0
+        except SystemExit as e:
+            # argparse rejects bad arguments with SystemExit(2)
+            returncode = e.code if isinstance(e.code, int) else 1
+            stderr = f"Invalid arguments for {command}: {' '.join(args)}"
+        except Exception as e:
+            cli.console.print(f"[bold red]Error: {e}[/bold red]")
+            returncode = 1
+    return {
+        'success': returncode == 0,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr,
+        'returncode': returncode,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    command = request.get('command')
+    if command == 'ping':
+        return {'success': True, 'pid': os.getpid(), 'cwd': os.getcwd()}
+    if command not in WORKER_COMMANDS:
+        return {'success': False, 'stdout': '', 'returncode': -1,
+                'stderr': f"Unsupported worker command: {command}"}
+    return execute(command, request.get('args') or [])
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                response = handle_request(request)
+            except ValueError as e:
+                response = {'success': False, 'stdout': '', 'returncode': -1,
+                            'stderr': f"Invalid request: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class WorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _claim_socket(socket_path: str) -> None:
+    """Remove a stale socket file, refusing if a worker is still listening."""
+    if not os.path.exists(socket_path):
+        os.makedirs(os.path.dirname(socket_path) or '.', exist_ok=True)
+        return
+    try:
+        WorkerClient(socket_path, timeout=1.0).ping()
+    except OSError:
+        os.unlink(socket_path)
+        return
+    raise RuntimeError(f"A worker is already listening on {socket_path}")
+
+
+def serve(socket_path: Optional[str] = None, on_ready: Optional[Callable[[], None]] = None) -> None:
+    """Warm up and serve requests until interrupted or sent SIGTERM."""
+    socket_path = socket_path or default_socket_path()
+    warm_up()
+    _claim_socket(socket_path)
+
+    server = WorkerServer(socket_path, _RequestHandler)
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if on_ready:
+        on_ready()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class WorkerClient:
+    """Send commands to a running worker.
+
+    Used by serve() to detect a live worker and by scripts/bench_worker.py.
+    Raises OSError (connection refused, missing socket, timeout) when the
+    worker cannot answer.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall((json.dumps(payload) + "\n").encode())
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("Worker closed the connection without replying")
+        return json.loads(line)
+
+    def run(self, command: str, args: List[str]) -> Dict[str, Any]:
+        return self.request({'command': command, 'args': list(args)})
+
+    def ping(self) -> Dict[str, Any]:
+        return self.request({'command': 'ping'})
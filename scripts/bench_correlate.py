@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark triage latency against the size of the jobs/logs/releases tables.
+
+Builds synthetic copies of data/ with N rows in jobs_registry.csv,
+logs_mock.csv and releases.csv (the real rows are kept at the end so the
+demo incident still matches), then times correlate_incident() for
+incidents/TCK-1001.json.
+
+Usage:
+    python scripts/bench_correlate.py --sizes 1000 10000 100000 --repeat 20
+"""
+import argparse
+import csv
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def build_tree(target: Path, rows: int) -> None:
+    """Copy the data maps into target/ and pad the large tables to `rows`."""
+    shutil.copytree(ROOT / 'data', target / 'data')
+    shutil.copytree(ROOT / 'docs', target / 'docs')
+    shutil.copytree(ROOT / 'incidents', target / 'incidents')
+
+    def pad(name, header, make_row):
+        path = target / 'data' / name
+        with open(path, 'r') as f:
+            original = list(csv.reader(f))[1:]
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for i in range(rows):
+                writer.writerow(make_row(i))
+            writer.writerows(original)
+
+    pad('jobs_registry.csv', ['job_id', 'workflow_id', 'service', 'repo', 'handler'],
+        lambda i: [f'job-x{i}', f'flow-x{i}', 'orders-api', 'repo-orders', f'src/gen/job_{i}.ts#run'])
+    pad('logs_mock.csv', ['request_id', 'session_id', 'message'],
+        lambda i: [f'req_x{i}', f'sess_x{i}', f'INFO request handled at src/gen/handler_{i % 97}.ts:{i % 500}'])
+    pad('releases.csv', ['service', 'release_tag', 'commits'],
+        lambda i: ['orders-api', f'2024.{i // 1000:02d}.{i % 1000:03d}', f'c{i:07x}'])
+
+
+def bench(rows: int, repeat: int) -> dict:
+    """Return cold/warm triage latency in milliseconds for one table size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        build_tree(Path(tmp), rows)
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            from rca import loaders
+            from rca.correlate import correlate_incident
+            if hasattr(loaders, '_knowledge_base'):
+                loaders._knowledge_base = None
+            incident = loaders.load_incident('incidents/TCK-1001.json')
+
+            started = time.perf_counter()
+            correlate_incident(incident)
+            cold = (time.perf_counter() - started) * 1000
+
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                correlate_incident(incident)
+                samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            os.chdir(cwd)
+    return {'rows': rows, 'cold_ms': cold, 'warm_ms': statistics.median(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'cold (ms)':>12} {'warm p50 (ms)':>14}")
+    for rows in args.sizes:
+        result = bench(rows, args.repeat)
+        print(f"{result['rows']:>10} {result['cold_ms']:>12.2f} {result['warm_ms']:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
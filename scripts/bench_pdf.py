@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark PDF rendering of markdown with a large fenced diff.
+
+Renders a document holding one ```diff block of --lines lines in two ways:
+
+    per-line    one Paragraph per diff line (how code blocks used to be
+                rendered, escaped so the markup parser accepts them)
+    chunked     Preformatted chunks of CODE_CHUNK_LINES lines
+                (rca_writer.markdown_to_pdf)
+
+and reports the median time, time per 1k diff lines, page count and peak
+Python memory (tracemalloc) of one render per mode. Time per 1k lines
+staying flat across sizes means rendering is linear in the diff length.
+
+Usage:
+    python scripts/bench_pdf.py --lines 1000 5000 20000 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from rca.rca_writer import markdown_to_pdf, pdf_styles
+
+
+def make_markdown(lines: int) -> str:
+    body = []
+    for i in range(lines // 2):
+        body.append(f"-    value_{i} = limits.LIMITS[user_tier]['max']  # old line {i}")
+        body.append(f"+    value_{i} = limits.LIMITS.get(user_tier, {{}}).get('max')  # new line {i}")
+    return ("# RCA: TCK-BENCH\n\n## Code Changes\n\n```diff\n"
+            "--- a/service/payment/limits.py\n+++ b/service/payment/limits.py\n"
+            f"@@ -1,{lines // 2} +1,{lines // 2} @@\n" + "\n".join(body) + "\n```\n\n"
+            "## Prevention\n\n- Add regression tests\n")
+
+
+def render_per_line(markdown_content: str, pdf_path: str) -> None:
+    styles, title_style, heading_style, _ = pdf_styles()
+    story = []
+    for line in markdown_content.split('\n'):
+        line = line.strip()
+        if not line or line.startswith('```'):
+            story.append(Spacer(1, 6))
+        elif line.startswith('# '):
+            story.append(Paragraph(line[2:], title_style))
+        elif line.startswith('## '):
+            story.append(Paragraph(line[3:], heading_style))
+        else:
+            story.append(Paragraph(escape(line), styles['Code']))
+    SimpleDocTemplate(pdf_path, pagesize=letter).build(story)
+
+
+MODES = {'per-line': render_per_line, 'chunked': markdown_to_pdf}
+
+
+def page_count(pdf_path: str) -> int:
+    with open(pdf_path, 'rb') as f:
+        return f.read().count(b'/Type /Page\n')
+
+
+def time_mode(render, markdown_content: str, pdf_path: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(markdown_content, pdf_path)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def peak_memory(render, markdown_content: str, pdf_path: str) -> int:
+    tracemalloc.start()
+    render(markdown_content, pdf_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'bench.pdf')
+        for lines in args.lines:
+            markdown_content = make_markdown(lines)
+            for mode in args.modes:
+                render = MODES[mode]
+                median = time_mode(render, markdown_content, pdf_path, args.repeat)
+                pages = page_count(pdf_path)
+                peak = peak_memory(render, markdown_content, pdf_path) / 1e6
+                print(f"{lines:>6} lines  {mode:<9} median {median * 1000:8.1f} ms   "
+                      f"{median * 1e6 / lines:6.1f} ms/1k lines   {pages:4d} pages   peak {peak:6.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Benchmark markdown rendering for the four document templates.
+
+Renders rca_initial, rca_final, pr_draft and comparison with large diff
+payloads (--diffs diffs of --diff-lines lines each; the comparison diffs
+before/after code of the same total size, one line in 50 changed) in
+three ways:
+
+    fresh-env   new Environment per render, render() to a string, write
+                (how the writers used to work)
+    shared      shared environment, render() to a string, write
+    streamed    shared environment, generate() streamed to the file
+                (templating.render_to_file)
+
+It also times a cold template load in a new environment with and without
+the bytecode cache, and measures peak Python memory of one render per
+mode with tracemalloc.
+
+Usage:
+    python scripts/bench_templates.py --diffs 20 --diff-lines 2000 --repeat 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from rca.artifacts import write_text_artifact
+from rca.diffing import FileDiff
+from rca.rca_writer import final_rca_context, initial_rca_context
+from rca.schema import Candidate, Incident, Observation, RCAData
+from rca.templating import TEMPLATE_DIR, get_jinja_env, render_to_file
+
+TEMPLATES = ('rca_initial.md.j2', 'rca_final.md.j2', 'pr_draft.md.j2', 'comparison.md.j2')
+
+
+def make_diff(index: int, lines: int) -> str:
+    body = []
+    for i in range(lines):
+        body.append(f"-    value_{index}_{i} = limits.LIMITS[user_tier]['max']  # old line {i}")
+        body.append(f"+    value_{index}_{i} = limits.LIMITS.get(user_tier, {{}}).get('max')  # new line {i}")
+    return f"--- a/service/module_{index}.py\n+++ b/service/module_{index}.py\n@@ -1,{lines} +1,{lines} @@\n" + "\n".join(body)
+
+
+def make_contexts(diffs: int, diff_lines: int) -> dict:
+    """Template variables for each template with large payloads."""
+    incident = Incident(
+        id='TCK-BENCH', title='Checkout timeouts under load', service='orders-api',
+        created_at='2025-09-13T10:00:00Z', resolved_at='2025-09-13T12:30:00Z',
+        impact='High', error_message='CheckoutTimeoutError: payment gateway exceeded 5s'
+    )
+    diff_texts = [make_diff(i, diff_lines) for i in range(diffs)]
+    rca_data = RCAData(
+        incident=incident,
+        suspect=Candidate(repo='repo-orders', file='src/orders/checkout.ts', score=9,
+                          reasons=['stack trace match', 'recent release']),
+        summary='Synthetic RCA used for template benchmarks',
+        created_at=incident.created_at, resolved_at=incident.resolved_at, tat='2h 30m',
+        impact=incident.impact,
+        whys=[f'Why {i}: cause {i}' for i in range(5)],
+        observations=[Observation(kind='code_quality', note=f'Observation {i}', rule=f'rule-{i}')
+                      for i in range(50)],
+        diffs=diff_texts,
+        validations=[f'Validation {i}' for i in range(50)],
+        prevention=[f'Prevention {i}' for i in range(50)],
+        owners='Orders Team'
+    )
+    files_changed = ", ".join(f"service/module_{i}.py" for i in range(diffs))
+    code_lines = diffs * diff_lines
+    before = "\n".join(f"const value{i} = limits[tier].max; // line {i}" for i in range(code_lines))
+    after = "\n".join(f"const value{i} = limits[tier]?.max ?? 0; // line {i}" if i % 50 == 0
+                      else f"const value{i} = limits[tier].max; // line {i}" for i in range(code_lines))
+    return {
+        'rca_initial.md.j2': initial_rca_context(rca_data),
+        'rca_final.md.j2': final_rca_context(rca_data, 'f' * 40, files_changed, "\n".join(diff_texts)),
+        'pr_draft.md.j2': dict(incident=incident, summary=rca_data.summary, diffs=diff_texts,
+                               risks=['Retry may double-charge'], validations=rca_data.validations),
+        'comparison.md.j2': dict(incident_id=incident.id, file_path='src/orders/checkout.ts',
+                                 before_code=before, after_code=after, diff=FileDiff(before, after),
+                                 show_full=False, before_lang='typescript', after_lang='typescript',
+                                 delta_note='Safe access', timeline_delta='Fixed in commit ffffffff'),
+    }
+
+
+def fresh_env() -> Environment:
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR), trim_blocks=True, lstrip_blocks=True)
+
+
+def render_fresh(name: str, context: dict, path: str) -> None:
+    write_text_artifact(path, fresh_env().get_template(name).render(**context))
+
+
+def render_shared(name: str, context: dict, path: str) -> None:
+    write_text_artifact(path, get_jinja_env().get_template(name).render(**context))
+
+
+def render_streamed(name: str, context: dict, path: str) -> None:
+    render_to_file(name, path, **context)
+
+
+MODES = {'fresh-env': render_fresh, 'shared': render_shared, 'streamed': render_streamed}
+
+
+def time_mode(render, contexts: dict, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for name, context in contexts.items():
+            render(name, context, f"out/{name.split('.')[0]}.md")
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def peak_memory(render, contexts: dict) -> int:
+    tracemalloc.start()
+    for name, context in contexts.items():
+        render(name, context, f"out/{name.split('.')[0]}.md")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def cold_load(bytecode_dir, repeat: int) -> float:
+    """Median time to load all four templates in a brand-new environment."""
+    timings = []
+    for _ in range(repeat):
+        env = fresh_env()
+        if bytecode_dir:
+            env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+        started = time.perf_counter()
+        for name in TEMPLATES:
+            env.get_template(name)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--diffs', type=int, default=20)
+    parser.add_argument('--diff-lines', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(ROOT / 'docs' / 'templates', Path(tmp) / TEMPLATE_DIR)
+        os.chdir(tmp)
+        contexts = make_contexts(args.diffs, args.diff_lines)
+        # Warm up the shared environment (and its bytecode cache) once
+        for name, context in contexts.items():
+            render_streamed(name, context, f"out/{name.split('.')[0]}.md")
+        output_mb = sum(os.path.getsize(f"out/{n.split('.')[0]}.md") for n in TEMPLATES) / 1e6
+
+        print(f"4 templates, {output_mb:.1f} MB of markdown per round, {args.repeat} rounds")
+        for mode, render in MODES.items():
+            timings = time_mode(render, contexts, args.repeat)
+            median = statistics.median(timings)
+            peak = peak_memory(render, contexts) / 1e6
+            print(f"{mode:<10} median {median * 1000:8.1f} ms/round   "
+                  f"{4 / median:7.1f} docs/s   {output_mb / median:7.1f} MB/s   peak {peak:6.1f} MB")
+
+        bytecode_dir = os.path.join(tmp, 'bytecode')
+        os.makedirs(bytecode_dir)
+        cold_load(bytecode_dir, 1)
+        print(f"cold template load: {cold_load(None, args.repeat):.2f} ms compiling, "
+              f"{cold_load(bytecode_dir, args.repeat):.2f} ms from bytecode cache")
+        os.chdir(ROOT)
+
+
+if __name__ == '__main__':
+    main()
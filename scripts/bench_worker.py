@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Compare triage latency through a CLI subprocess and through the worker.
+
+Starts `python -m rca.cli worker` on a temporary socket, then times
+`triage` both ways for incidents/TCK-1001.json.
+
+Usage:
+    python scripts/bench_worker.py --repeat 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rca.worker import WorkerClient
+
+
+def time_subprocess(incident_file: str, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'rca.cli', 'triage', incident_file],
+                       cwd=ROOT, capture_output=True, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def time_worker(client: WorkerClient, incident_file: str, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.run('triage', [incident_file])
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response['success'], response['stdout']
+    return timings
+
+
+def wait_for_worker(client: WorkerClient, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("Worker exited during startup")
+        try:
+            client.ping()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Worker did not start in time")
+
+
+def report(label: str, timings: list) -> None:
+    print(f"{label:<12} median {statistics.median(timings):8.2f} ms   "
+          f"min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--incident', default='incidents/TCK-1001.json')
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(prefix='rca-worker-'), 'worker.sock')
+    proc = subprocess.Popen([sys.executable, '-m', 'rca.cli', 'worker', '--socket', socket_path],
+                            cwd=ROOT, stdout=subprocess.DEVNULL)
+    client = WorkerClient(socket_path)
+    try:
+        wait_for_worker(client, proc)
+        # First call persists the analysis artifact, as a first CLI run would
+        client.run('triage', [args.incident])
+        report('subprocess', time_subprocess(args.incident, args.repeat))
+        report('worker', time_worker(client, args.incident, args.repeat))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == '__main__':
+    main()
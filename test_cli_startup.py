@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Check that `rca.cli triage` starts within its import-time budget.
+
+The budget (seconds of import time) defaults to 1.0 and can be overridden
+with RCA_STARTUP_BUDGET, e.g. on slow CI machines.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rca.cli import measure_startup
+
+STARTUP_BUDGET = float(os.getenv('RCA_STARTUP_BUDGET', '1.0'))
+INCIDENT_FILE = 'incidents/TCK-1001.json'
+
+# Needed only by document writers and the Linear client, never by triage
+HEAVY_MODULES = ('reportlab', 'requests', 'jinja2', 'dotenv')
+
+
+def _triage_startup():
+    # The CLI reads data/, repos/ and incidents/ relative to the working directory
+    os.chdir(Path(__file__).parent)
+    report = measure_startup(['triage', INCIDENT_FILE])
+    assert report['returncode'] == 0, report['stderr']
+    return report
+
+
+def test_triage_startup_budget():
+    """Triage import time stays under the budget."""
+    report = _triage_startup()
+    print(f"⏱️  triage imports: {report['import_seconds'] * 1000:.0f} ms "
+          f"(budget {STARTUP_BUDGET * 1000:.0f} ms)")
+    assert report['import_seconds'] <= STARTUP_BUDGET
+
+
+def test_triage_skips_heavy_modules():
+    """Triage does not import the PDF, template or HTTP stacks."""
+    report = _triage_startup()
+    loaded = {m['module'].split('.', 1)[0] for m in report['modules']}
+    unexpected = sorted(loaded.intersection(HEAVY_MODULES))
+    assert not unexpected, f"triage imported {unexpected}"
+
+
+if __name__ == "__main__":
+    print("🚀 RCA CLI Startup Test")
+    print("=" * 50)
+    test_triage_startup_budget()
+    test_triage_skips_heavy_modules()
+    print("✅ Startup within budget")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Check the comparison diff engine.
+
+Random edits must round-trip through the opcodes with a minimal number of
+changed lines, and a few edits in a large file must diff quickly into
+hunks that hold only the changes and their context.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rca.diffing import FileDiff, diff_opcodes
+
+LARGE_FILE_LINES = 20000
+
+
+def _lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def test_random_edits_are_minimal():
+    """Opcodes rebuild the new lines and keep a longest common subsequence."""
+    rng = random.Random(1)
+    for _ in range(500):
+        alphabet = rng.randint(1, 6)
+        a = [str(rng.randint(0, alphabet)) for _ in range(rng.randint(0, 30))]
+        b = [str(rng.randint(0, alphabet)) for _ in range(rng.randint(0, 30))]
+        rebuilt, unchanged = [], 0
+        i = j = 0
+        for tag, i1, i2, j1, j2 in diff_opcodes(a, b):
+            assert (i1, j1) == (i, j)
+            i, j = i2, j2
+            if tag == 'equal':
+                assert a[i1:i2] == b[j1:j2]
+                unchanged += i2 - i1
+            rebuilt += b[j1:j2]
+        assert (i, j) == (len(a), len(b)) and rebuilt == b
+        assert unchanged == _lcs_length(a, b)
+
+
+def test_large_file_hunks():
+    """Only changed hunks (with context) come out of a large file."""
+    before = [f"value_{i} = compute({i})" for i in range(LARGE_FILE_LINES)]
+    after = list(before)
+    for i in (10, 5000, 19990):
+        after[i] += "  # fixed"
+    after.insert(8000, "guard()")
+
+    started = time.perf_counter()
+    diff = FileDiff("\n".join(before), "\n".join(after), context=2)
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  {LARGE_FILE_LINES}-line diff: {elapsed * 1000:.0f} ms")
+
+    assert (diff.added, diff.removed) == (4, 3)
+    assert [hunk.header for hunk in diff.hunks] == [
+        '@@ -9,5 +9,5 @@', '@@ -4999,5 +4999,5 @@', '@@ -7999,4 +7999,5 @@', '@@ -19989,5 +19990,5 @@'
+    ]
+    assert diff.hunks[2].unified()[1:] == [
+        ' value_7998 = compute(7998)', ' value_7999 = compute(7999)', '+guard()',
+        ' value_8000 = compute(8000)', ' value_8001 = compute(8001)'
+    ]
+    assert diff.hunks[0].side_by_side()[3].split() == [
+        '11', 'value_10', '=', 'compute(10)', '|', '11', 'value_10', '=', 'compute(10)', '#', 'fixed'
+    ]
+    assert elapsed < 2.0
+
+
+if __name__ == "__main__":
+    print("🚀 Diff Engine Tests")
+    print("=" * 50)
+    test_random_edits_are_minimal()
+    test_large_file_hunks()
+    print("✅ All diff checks passed")
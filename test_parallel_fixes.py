@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Stress test: apply fixes for many incidents at once.
+
+Each incident's fix is committed from its own git worktree, so concurrent
+runs must produce one independent commit per incident, leave the shared
+working tree untouched and leave no worktrees behind. The number of
+incidents defaults to 8 (override with RCA_STRESS_INCIDENTS).
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rca.gitutils import (FIXED_FILES, apply_fix_commit, fix_branch, get_fix_base, get_fix_commit,
+                          get_git_reader)
+
+INCIDENT_COUNT = int(os.getenv('RCA_STRESS_INCIDENTS', '8'))
+
+
+def _git(repo, *args):
+    return subprocess.run(["git"] + list(args), cwd=repo, capture_output=True,
+                          text=True, check=True).stdout.strip()
+
+
+def _make_repo(buggy=True):
+    """Scratch repo holding a copy of repos/, by default with the suspect files unfixed."""
+    repo = tempfile.mkdtemp(prefix='rca-fixes-')
+    shutil.copytree(Path(__file__).parent / 'repos', Path(repo) / 'repos')
+    for relative_path in FIXED_FILES:
+        if buggy:
+            (Path(repo) / relative_path).write_text("# buggy version\n")
+        else:
+            (Path(repo) / relative_path).write_text(FIXED_FILES[relative_path])
+    _git(repo, 'init', '-q')
+    _git(repo, 'config', 'user.name', 'RCA Agent')
+    _git(repo, 'config', 'user.email', 'rca@example.com')
+    _git(repo, 'add', '.')
+    _git(repo, 'commit', '-q', '-m', 'Bug: Add timeout issue and unsafe dict access')
+    return repo
+
+
+def _apply_all(repo, incident_ids):
+    with ThreadPoolExecutor(max_workers=len(incident_ids)) as pool:
+        commits = pool.map(lambda incident_id: apply_fix_commit(incident_id, repo), incident_ids)
+        return dict(zip(incident_ids, commits))
+
+
+def test_parallel_fixes():
+    """Concurrent fixes each land on their own branch without interference."""
+    repo = _make_repo()
+    try:
+        base = _git(repo, 'rev-parse', 'HEAD')
+        incident_ids = [f"TCK-{9000 + i}" for i in range(INCIDENT_COUNT)]
+        commits = _apply_all(repo, incident_ids)
+        print(f"🔧 {len(commits)} fixes committed concurrently")
+
+        assert len(set(commits.values())) == len(incident_ids)
+        for incident_id, commit in commits.items():
+            assert commit != "fix_commit_hash", f"apply_fix failed for {incident_id}"
+            assert get_fix_commit(incident_id, repo) == commit
+            assert get_fix_base(incident_id, repo) == base
+            assert _git(repo, 'rev-parse', f'{commit}^') == base
+            changed = _git(repo, 'show', '--name-only', '--pretty=format:', commit).split()
+            assert sorted(changed) == sorted(FIXED_FILES)
+            assert _git(repo, 'show', f'{commit}:repos/repo-payments/service/payment/limits.py') \
+                == FIXED_FILES['repos/repo-payments/service/payment/limits.py'].strip()
+
+        # Shared working tree and HEAD are untouched; worktrees are cleaned up
+        assert _git(repo, 'rev-parse', 'HEAD') == base
+        assert _git(repo, 'status', '--porcelain', '--untracked-files=no') == ''
+        assert len(_git(repo, 'worktree', 'list', '--porcelain').split('\n\n')) == 1
+        _git(repo, 'fsck', '--no-dangling')
+
+        # Re-running returns the existing fix commits instead of empty commits
+        assert _apply_all(repo, incident_ids) == commits
+        branches = _git(repo, 'branch', '--list', fix_branch('*'), '--format=%(refname:short)')
+        assert sorted(branches.split()) == sorted(fix_branch(i) for i in incident_ids)
+    finally:
+        get_git_reader(repo).close()
+        shutil.rmtree(repo, ignore_errors=True)
+
+
+def test_noop_fix_returns_base():
+    """Files that already hold the fix yield the recorded base, not a fix commit."""
+    repo = _make_repo(buggy=False)
+    try:
+        base = _git(repo, 'rev-parse', 'HEAD')
+        commit = apply_fix_commit('TCK-9100', repo)
+        assert commit == base == get_fix_base('TCK-9100', repo)
+        assert get_fix_commit('TCK-9100', repo) == base
+    finally:
+        get_git_reader(repo).close()
+        shutil.rmtree(repo, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("🚀 Parallel Fix Stress Test")
+    print("=" * 50)
+    test_parallel_fixes()
+    test_noop_fix_returns_base()
+    print("✅ All fixes committed independently")